@@ -0,0 +1,108 @@
+# --------------------
+# Scaled sprite cache
+# --------------------
+# Sprites are stored on disk already scaled, as raw BGRA pixels (the usual
+# in-memory layout of convert_alpha() surfaces), so a warm start only reads
+# the file and wraps it with pygame.image.frombuffer. Entries are keyed by
+# source path and target size, and rebuilt when the source mtime changes.
+# Cold entries are decoded and scaled on a thread pool.
+
+import hashlib
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+CACHE_DIR = ".asset_cache"
+CACHE_MAGIC = b"CCLS"
+CACHE_VERSION = 1
+HEADER = struct.Struct("<4sHqII")  # magic, version, source mtime_ns, width, height
+PIXEL_FORMAT = "BGRA"
+
+last_stats = {"hits": 0, "misses": 0, "seconds": 0.0}
+
+
+def _target_size(size_spec, source_size):
+    # (w, h) is used as is; (None, h) keeps the source aspect ratio
+    width, height = size_spec
+    if width is None:
+        width = int(source_size[0] * (height / source_size[1]))
+    return width, height
+
+
+def _cache_path(cache_dir, path, size_spec):
+    key = f"{os.path.abspath(path)}|{size_spec[0]}x{size_spec[1]}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".bgra")
+
+
+def _read_cached(cache_file, mtime_ns):
+    try:
+        with open(cache_file, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, cached_mtime, width, height = HEADER.unpack_from(data)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION or cached_mtime != mtime_ns
+            or len(data) != HEADER.size + width * height * 4):
+        return None
+    # memoryview slice keeps this zero-copy; the surface holds on to the buffer
+    return pygame.image.frombuffer(memoryview(data)[HEADER.size:], (width, height),
+                                   PIXEL_FORMAT)
+
+
+def _decode_and_store(path, size_spec, mtime_ns, cache_file):
+    img = pygame.image.load(path)
+    img = pygame.transform.scale(img, _target_size(size_spec, img.get_size()))
+    width, height = img.get_size()
+    pixels = pygame.image.tobytes(img, PIXEL_FORMAT)
+
+    tmp_file = cache_file + ".tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, mtime_ns, width, height))
+            f.write(pixels)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # a read-only install still works, just without the cache
+    return pygame.image.frombuffer(pixels, (width, height), PIXEL_FORMAT)
+
+
+def load_scaled(jobs, cache_dir=CACHE_DIR, workers=None):
+    # jobs: list of (path, (width, height)) with width None to keep aspect.
+    # Returns alpha surfaces in the same order.
+    start = time.perf_counter()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        pass  # every entry misses and nothing is stored, as in _decode_and_store
+
+    surfaces = [None] * len(jobs)
+    cold = []
+    for i, (path, size_spec) in enumerate(jobs):
+        mtime_ns = os.stat(path).st_mtime_ns
+        cache_file = _cache_path(cache_dir, path, size_spec)
+        surfaces[i] = _read_cached(cache_file, mtime_ns)
+        if surfaces[i] is None:
+            cold.append((i, path, size_spec, mtime_ns, cache_file))
+
+    if cold:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(i, pool.submit(_decode_and_store, *job)) for i, *job in cold]
+            for i, future in futures:
+                surfaces[i] = future.result()
+
+    # Only convert when the display's pixel layout differs from the cache's
+    display_masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+    for i, surface in enumerate(surfaces):
+        if surface.get_masks() != display_masks:
+            surfaces[i] = surface.convert_alpha()
+
+    last_stats["hits"] = len(jobs) - len(cold)
+    last_stats["misses"] = len(cold)
+    last_stats["seconds"] = time.perf_counter() - start
+    return surfaces
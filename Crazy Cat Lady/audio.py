@@ -0,0 +1,135 @@
+# --------------------
+# Audio
+# --------------------
+# Sounds are decoded on a background thread so loading never holds up the
+# first frame; anything played before it is ready is simply skipped.
+# Decoded PCM can be cached on disk so later launches skip the mp3 decoder.
+# Playback goes through a fixed pool of channels: a new sound takes a free
+# channel, otherwise steals the oldest voice of equal or lower priority,
+# otherwise it is dropped. The same sound plays at most once per frame.
+
+import hashlib
+import os
+import struct
+import threading
+import time
+
+import pygame
+
+
+PCM_MAGIC = b"CCLA"
+PCM_VERSION = 1
+PCM_HEADER = struct.Struct("<4sHqiii")  # magic, version, source mtime_ns, freq, size, channels
+
+
+class AudioManager:
+    def __init__(self, channels=8, cache_dir=None):
+        pygame.mixer.init()  # make sure the mixer is initialized
+        pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)  # nothing else grabs our channels
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [(0, 0.0)] * channels  # (priority, start time) per channel
+
+        self.cache_dir = cache_dir
+        self.sounds = {}       # name -> (Sound, priority), filled in by the loader
+        self.lock = threading.Lock()
+        self.played_this_frame = set()
+        self.stats = {"played": 0, "stolen": 0, "dropped": 0, "limited": 0}
+
+    # --------------------
+    # Loading
+    # --------------------
+    def load_async(self, sounds, music=None):
+        # sounds: {name: (path, volume, priority)}; music: (path, volume) or None
+        thread = threading.Thread(target=self._load, args=(sounds, music), daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, sounds, music):
+        if music:
+            path, volume = music
+            try:
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.set_volume(volume)  # volume from 0.0 to 1.0
+                pygame.mixer.music.play(-1)            # -1 means loop forever
+            except (pygame.error, OSError) as e:
+                print(f"audio: could not play {path}: {e}")
+
+        for name, (path, volume, priority) in sounds.items():
+            try:
+                sound = self._decode(path)
+            except (pygame.error, OSError) as e:
+                print(f"audio: could not load {path}: {e}")
+                continue
+            sound.set_volume(volume)
+            with self.lock:
+                self.sounds[name] = (sound, priority)
+
+    def _decode(self, path):
+        if not self.cache_dir:
+            return pygame.mixer.Sound(path)
+
+        # PCM is only valid for the mixer format it was decoded for
+        freq, size, channels = pygame.mixer.get_init()
+        mtime_ns = os.stat(path).st_mtime_ns
+        # Keyed by the full path, so same-named files in different folders don't clash
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        cache_file = os.path.join(self.cache_dir, key + ".pcm")
+        try:
+            with open(cache_file, "rb") as f:
+                data = f.read()
+            header = PCM_HEADER.unpack_from(data)
+            if header == (PCM_MAGIC, PCM_VERSION, mtime_ns, freq, size, channels):
+                return pygame.mixer.Sound(buffer=memoryview(data)[PCM_HEADER.size:])
+        except (OSError, struct.error):
+            pass
+
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_file + ".tmp", "wb") as f:
+                f.write(PCM_HEADER.pack(PCM_MAGIC, PCM_VERSION, mtime_ns, freq, size, channels))
+                f.write(sound.get_raw())
+            os.replace(cache_file + ".tmp", cache_file)
+        except OSError:
+            pass
+        return sound
+
+    # --------------------
+    # Playback
+    # --------------------
+    def new_frame(self):
+        self.played_this_frame.clear()
+
+    def play(self, name):
+        with self.lock:
+            entry = self.sounds.get(name)
+        if entry is None:
+            return False  # still loading (or failed); never wait for it
+        if name in self.played_this_frame:
+            self.stats["limited"] += 1
+            return False
+
+        sound, priority = entry
+        index = self._pick_channel(priority)
+        if index is None:
+            self.stats["dropped"] += 1
+            return False
+        if self.channels[index].get_busy():
+            self.stats["stolen"] += 1
+
+        self.channels[index].play(sound)
+        self.voices[index] = (priority, time.perf_counter())
+        self.played_this_frame.add(name)
+        self.stats["played"] += 1
+        return True
+
+    def _pick_channel(self, priority):
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            voice_priority, _ = self.voices[i]
+            if voice_priority <= priority and (victim is None or self.voices[i] < self.voices[victim]):
+                victim = i
+        return victim
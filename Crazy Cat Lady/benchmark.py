@@ -0,0 +1,204 @@
+# --------------------
+# Benchmark suite
+# --------------------
+# Runs main.py headless (dummy SDL, fixed seed) over scenarios that scale
+# the world, and compares the numbers against a stored baseline.
+#
+#   python benchmark.py                         run everything
+#   python benchmark.py --save-baseline         ...and keep it as the baseline
+#   python benchmark.py --only wide,many_cats   just some scenarios
+#
+# Exits with status 1 when a metric regressed past --threshold.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pygame
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# main.py flags per scenario; "ticks" overrides the run length
+SCENARIOS = {
+    "default": {},
+    "wide": {"world_width": 16000},
+    "very_wide": {"world_width": 64000},
+    "dense_platforms": {"platform_density": 3},
+    "dense_decor": {"decor_density": 4},
+    "many_cats": {"max_cats": 64, "ticks": 6000},
+    "everything": {"world_width": 16000, "platform_density": 3, "decor_density": 4,
+                   "max_cats": 64, "ticks": 6000},
+    "endless": {"endless": True}
+}
+
+# (name, path into main.py's report); lower is better for all of them
+METRICS = [
+    ("startup_ms", ("startup_ms",)),
+    ("generation_ms", ("generation_ms",)),
+    ("sim_ms_mean", ("sim_ms", "mean")),
+    ("sim_ms_p95", ("sim_ms", "p95")),
+    ("render_ms_mean", ("render_ms", "mean")),
+    ("render_ms_p95", ("render_ms", "p95"))
+]
+NOISE_FLOOR_MS = 0.05  # smaller differences are never called regressions
+
+
+def scenario_command(params, seed, ticks, report_path):
+    command = [sys.executable, "main.py", "--headless", "--render", "--no-level-cache",
+               "--seed", str(seed), "--ticks", str(params.get("ticks", ticks)),
+               "--report", report_path]
+    for key, value in params.items():
+        if key == "ticks":
+            continue
+        if value is True:
+            command.append("--" + key.replace("_", "-"))
+        else:
+            command += ["--" + key.replace("_", "-"), str(value)]
+    return command
+
+
+def run_scenario(params, seed, ticks, repeats):
+    # Every repeat is a fresh process, so startup is measured cold each time
+    reports = []
+    process_ms = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, "report.json")
+            start = time.perf_counter()
+            result = subprocess.run(scenario_command(params, seed, ticks, report_path),
+                                    cwd=GAME_DIR, capture_output=True, text=True)
+            process_ms.append((time.perf_counter() - start) * 1000)
+            if result.returncode != 0:
+                raise RuntimeError(f"main.py failed:\n{result.stdout}{result.stderr}")
+            with open(report_path) as f:
+                reports.append(json.load(f))
+
+    # Median of the repeats for every metric
+    metrics = {"process_ms": statistics.median(process_ms)}
+    for name, path in METRICS:
+        values = [_lookup(report, path) for report in reports]
+        values = [v for v in values if v is not None]
+        if values:
+            metrics[name] = statistics.median(values)
+    return {"params": params, "metrics": metrics, "world": reports[-1]["world"]}
+
+
+def _lookup(report, path):
+    value = report
+    for key in path:
+        if value is None:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(results, baseline, threshold):
+    # Returns [(scenario, metric, old, new)] for everything that got slower
+    regressions = []
+    for name, result in results["scenarios"].items():
+        old_metrics = baseline["scenarios"].get(name, {}).get("metrics", {})
+        for metric, new in result["metrics"].items():
+            old = old_metrics.get(metric)
+            if old is None:
+                continue
+            if new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def print_table(results, baseline):
+    columns = ["process_ms"] + [name for name, _ in METRICS]
+    print(f"{'scenario':<16}" + "".join(f"{c:>16}" for c in columns))
+    for name, result in results["scenarios"].items():
+        old_metrics = (baseline or {}).get("scenarios", {}).get(name, {}).get("metrics", {})
+        cells = []
+        for column in columns:
+            value = result["metrics"].get(column)
+            if value is None:
+                cells.append(f"{'-':>16}")
+                continue
+            cell = f"{value:.3f}"
+            old = old_metrics.get(column)
+            if old:
+                cell += f" ({(value / old - 1) * 100:+.0f}%)"
+            cells.append(f"{cell:>16}")
+        print(f"{name:<16}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crazy Cat Lady benchmarks")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ticks", type=int, default=1800,
+                        help="ticks per run unless the scenario says otherwise")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="runs per scenario; the median is kept")
+    parser.add_argument("--only", default=None,
+                        help="comma-separated scenario names")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="slowdown that counts as a regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS)
+    if args.only:
+        names = args.only.split(",")
+        unknown = [n for n in names if n not in SCENARIOS]
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    results = {
+        "seed": args.seed,
+        "ticks": args.ticks,
+        "repeats": args.repeats,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.platform(),
+        "scenarios": {}
+    }
+    for name in names:
+        print(f"running {name}...", flush=True)
+        results["scenarios"][name] = run_scenario(SCENARIOS[name], args.seed,
+                                                  args.ticks, args.repeats)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print()
+    print_table(results, baseline)
+    print(f"\nresults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("no baseline to compare against (run with --save-baseline)")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name} {metric}: {old:.3f} -> {new:.3f} ms "
+              f"({(new / old - 1) * 100:+.0f}%)")
+    if not regressions:
+        print(f"no regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# --------------------
+# Cat pool
+# --------------------
+# Cats live in a fixed number of preallocated slots. Collecting a cat puts
+# its slot straight back on the free list, so long sessions never grow the
+# pool, and the active set is a dict keyed by slot for O(1) add/remove.
+
+
+class Cat:
+    __slots__ = ("slot", "uid", "rect", "image")
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.uid = -1      # unique per spawn, -1 while the slot is free
+        self.rect = None
+        self.image = 0     # index into the cat sprites
+
+
+class CatPool:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.slots = [Cat(i) for i in range(capacity)]
+        self.free = list(range(capacity - 1, -1, -1))  # pop() hands out slot 0 first
+        self.active = {}  # slot -> Cat, in spawn order
+        self.by_uid = {}  # uid -> Cat, for cats named over the network
+        self.next_uid = 0
+
+    def acquire(self, rect, image, uid=None):
+        # Returns the new cat, or None when every slot is taken. uid is for
+        # cats spawned elsewhere that keep their own id.
+        if not self.free:
+            return None
+        cat = self.slots[self.free.pop()]
+        cat.uid = self.next_uid if uid is None else uid
+        cat.rect = rect
+        cat.image = image
+        self.next_uid = max(self.next_uid, cat.uid + 1)
+        self.active[cat.slot] = cat
+        self.by_uid[cat.uid] = cat
+        return cat
+
+    def release(self, cat):
+        if self.active.pop(cat.slot, None) is None:
+            return False
+        del self.by_uid[cat.uid]
+        cat.uid = -1
+        cat.rect = None
+        self.free.append(cat.slot)
+        return True
+
+    def restore(self, cats, free, next_uid):
+        # Puts back a saved pool: cats are (slot, uid, rect, image) in spawn
+        # order and free is the free list as saved. Returns the live cats.
+        for cat in self.active.values():
+            cat.uid = -1
+            cat.rect = None
+        self.active = {}
+        self.by_uid = {}
+        for slot, uid, rect, image in cats:
+            cat = self.slots[slot]
+            cat.uid = uid
+            cat.rect = rect
+            cat.image = image
+            self.active[slot] = cat
+            self.by_uid[uid] = cat
+        self.free = list(free)
+        self.next_uid = next_uid
+        return list(self.active.values())
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(list(self.active.values()))
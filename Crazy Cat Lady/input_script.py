@@ -0,0 +1,65 @@
+# --------------------
+# Scripted keyboard input
+# --------------------
+# Headless runs have no keyboard, so they read key states from a script.
+# A script is a list of tokens: keys then a tick count, e.g. "R90 RJ1 -30 L45"
+#   R = right, L = left, J = jump, - = nothing pressed
+# The script loops when it runs out.
+
+import bisect
+
+import pygame
+
+
+TOKEN_KEYS = {
+    "R": pygame.K_RIGHT,
+    "L": pygame.K_LEFT,
+    "J": pygame.K_SPACE,
+}
+
+# Runs across the default world and back, hopping every 1.5 seconds
+DEFAULT_SCRIPT = " ".join(["R90 RJ1"] * 13 + ["L90 LJ1"] * 13)
+
+
+class KeyState:
+    # Stand-in for pygame.key.get_pressed(), indexable by key constant
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def parse_script(text):
+    steps = []
+    for token in text.split():
+        letters = token.rstrip("0123456789")
+        count = int(token[len(letters):] or 1)
+        pressed = []
+        for letter in letters.upper():
+            if letter == "-":
+                continue
+            if letter not in TOKEN_KEYS:
+                raise ValueError(f"unknown key {letter!r} in input script token {token!r}")
+            pressed.append(TOKEN_KEYS[letter])
+        if count > 0:
+            steps.append((KeyState(pressed), count))
+    if not steps:
+        raise ValueError("input script is empty")
+    return steps
+
+
+class ScriptedInput:
+    def __init__(self, text=DEFAULT_SCRIPT):
+        self.states = []
+        self.starts = []
+        total = 0
+        for state, count in parse_script(text):
+            self.states.append(state)
+            self.starts.append(total)
+            total += count
+        self.length = total
+
+    def keys_for(self, tick):
+        i = bisect.bisect_right(self.starts, tick % self.length) - 1
+        return self.states[i]
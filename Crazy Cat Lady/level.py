@@ -0,0 +1,379 @@
+# --------------------
+# Level generation
+# --------------------
+# Everything about a level's layout (platforms, flowers, bushes and the
+# starting cats) comes from one seeded random.Random, so a seed always gives
+# the same level. Generated levels are stored in a small binary file per
+# seed and loaded from there next time.
+
+import hashlib
+import math
+import os
+import random
+import struct
+import sys
+
+import pygame
+
+from spatial import SpatialHash
+
+
+# --------------------
+# Layout settings
+# --------------------
+GROUND_HEIGHT = 60
+
+PLATFORM_START_X = 500
+PLATFORM_END_MARGIN = 200
+PLATFORM_THICKNESS = 10
+MIN_PLATFORM_WIDTH = 80
+MAX_PLATFORM_WIDTH = 150
+MIN_GAP = 100
+MAX_GAP = 250
+MIN_VERTICAL_GAP = 20  # pixels between any two platforms
+
+FLOWER_W, FLOWER_H = 20, 30
+FLOWER_SPACING = 140
+BUSH_W, BUSH_H = 30, 20
+BUSH_SPACING = 300
+
+INITIAL_GROUND_CATS = 3
+PLACEMENT_PADDING = 6
+PLACEMENT_ATTEMPTS = 10
+BLOCKING_CELL_SIZE = 64
+
+
+# --------------------
+# Placement
+# --------------------
+def can_place(blocking, rect, padding=PLACEMENT_PADDING):
+    test = rect.inflate(padding, padding)
+    return not blocking.collides(test)
+
+
+def spawn_cat(rng, blocking, surface_rect, cat_size, image_count):
+    # Returns (rect, image index) for a free spot on top of surface_rect, or None
+    if surface_rect.width < cat_size:
+        return None
+    for attempt in range(PLACEMENT_ATTEMPTS):
+        x = surface_rect.x + rng.randint(0, surface_rect.width - cat_size)
+        cat_rect = pygame.Rect(x, 0, cat_size, cat_size)
+        cat_rect.bottom = surface_rect.top
+
+        # Only place if it does NOT collide with anything
+        if can_place(blocking, cat_rect):
+            return cat_rect, rng.randrange(image_count)
+    return None
+
+
+# --------------------
+# Platforms (varied, reachable, non-overlapping, fully separated)
+# --------------------
+def generate_platforms(rng, platforms, x, x_end, last_y, screen_h, max_jump_height, world_width,
+                       gaps=(MIN_GAP, MAX_GAP)):
+    # Appends to platforms and returns (x, last_y) so generation can resume
+    while x < x_end:
+        width = rng.randint(MIN_PLATFORM_WIDTH, MAX_PLATFORM_WIDTH)
+        height = screen_h - rng.randint(120, 250)
+
+        # Clamp height to be reachable from previous platform
+        if last_y - height > max_jump_height:
+            height = last_y - int(max_jump_height)
+
+        base_platform = pygame.Rect(x, height, width, PLATFORM_THICKNESS)
+        platforms.append(base_platform)
+
+        # Occasionally add a nearby higher platform
+        if rng.random() < 0.3:
+            higher_width = rng.randint(60, 120)
+            offset_x = rng.randint(-50, 50)
+            offset_y = rng.randint(20, int(max_jump_height - 10))
+            higher_x = max(0, min(x + offset_x, world_width - higher_width))
+            higher_y = max(50, height - offset_y)
+
+            new_higher = pygame.Rect(higher_x, higher_y, higher_width, PLATFORM_THICKNESS)
+
+            # Only add if it does not overlap ANY existing platform (horizontal OR vertical)
+            conflict = False
+            for p in platforms:
+                if new_higher.colliderect(p) or abs(new_higher.top - p.bottom) < MIN_VERTICAL_GAP or abs(new_higher.bottom - p.top) < MIN_VERTICAL_GAP:
+                    conflict = True
+                    break
+
+            if not conflict:
+                platforms.append(new_higher)
+
+        last_y = height
+        x += width + rng.randint(*gaps)
+    return x, last_y
+
+
+# --------------------
+# Foreground flowers & bushes
+# --------------------
+def generate_flowers(rng, blocking, x_start, x_end, ground_top, color_count, placed=None,
+                     spacing=FLOWER_SPACING):
+    # placed, if given, collects every rect added to blocking
+    flowers = []
+    for i in range(x_start, x_end, spacing):
+        for _ in range(PLACEMENT_ATTEMPTS):
+            x = i + rng.randint(0, 60)
+            y = ground_top
+            rect = pygame.Rect(x - FLOWER_W // 2, y - FLOWER_H, FLOWER_W, FLOWER_H)
+
+            if can_place(blocking, rect):
+                blocking.insert(rect)
+                if placed is not None:
+                    placed.append(rect)
+                flowers.append((x, y, rng.uniform(0, math.pi * 2), rng.randrange(color_count)))
+                break
+    return flowers
+
+
+def generate_bushes(rng, blocking, x_start, x_end, ground_top, variant_count, placed=None,
+                    spacing=BUSH_SPACING):
+    bushes = []
+    for i in range(x_start, x_end, spacing):
+        for _ in range(PLACEMENT_ATTEMPTS):
+            rect = pygame.Rect(i + rng.randint(0, 50), ground_top - 10, BUSH_W, BUSH_H)
+            if can_place(blocking, rect):
+                blocking.insert(rect)
+                if placed is not None:
+                    placed.append(rect)
+                bushes.append((rect.x, rect.y, rng.randrange(variant_count)))
+                break
+    return bushes
+
+
+# --------------------
+# Whole level
+# --------------------
+def generate_level(seed, world_width, screen_h, max_jump_height, cat_size,
+                   cat_image_count, flower_color_count, bush_variant_count,
+                   platform_gaps=(MIN_GAP, MAX_GAP), flower_spacing=FLOWER_SPACING,
+                   bush_spacing=BUSH_SPACING):
+    rng = random.Random(seed)
+    ground = pygame.Rect(0, screen_h - GROUND_HEIGHT, world_width, GROUND_HEIGHT)
+    blocking = SpatialHash(BLOCKING_CELL_SIZE)
+
+    platforms = []
+    generate_platforms(rng, platforms, PLATFORM_START_X, world_width - PLATFORM_END_MARGIN,
+                       screen_h - 100, screen_h, max_jump_height, world_width, platform_gaps)
+
+    # Starting cats: a few on the ground, one per platform
+    cats = []
+    surfaces = [ground] * INITIAL_GROUND_CATS + platforms
+    for surface in surfaces:
+        cat = spawn_cat(rng, blocking, surface, cat_size, cat_image_count)
+        if cat:
+            cat_rect, image = cat
+            blocking.insert(cat_rect)
+            cats.append((cat_rect.x, cat_rect.y, image))
+
+    flowers = generate_flowers(rng, blocking, 0, world_width, ground.top, flower_color_count,
+                               spacing=flower_spacing)
+    bushes = generate_bushes(rng, blocking, 0, world_width, ground.top, bush_variant_count,
+                             spacing=bush_spacing)
+
+    return {
+        "seed": seed,
+        "world_width": world_width,
+        "platforms": [tuple(p) for p in platforms],
+        "flowers": flowers,
+        "bushes": bushes,
+        "cats": cats
+    }
+
+
+# --------------------
+# Endless levels
+# --------------------
+# The same generator, run one chunk at a time. Platform generation carries
+# its x position and last height across chunks, so the MAX_JUMP_HEIGHT
+# clamp keeps every step reachable over chunk boundaries too.
+ENDLESS_CHUNK_WIDTH = 1024
+ENDLESS_GROUND_CATS = 1  # starting cats on each later chunk's ground
+
+
+def _aligned(x, spacing):
+    # First multiple of spacing at or after x, so decorations stay on the same
+    # grid no matter how the world is cut into chunks
+    return -(-x // spacing) * spacing
+
+
+class ChunkGenerator:
+    def __init__(self, seed, screen_h, max_jump_height, cat_size, cat_image_count,
+                 flower_color_count, bush_variant_count, platform_gaps=(MIN_GAP, MAX_GAP),
+                 flower_spacing=FLOWER_SPACING, bush_spacing=BUSH_SPACING,
+                 chunk_width=ENDLESS_CHUNK_WIDTH):
+        self.rng = random.Random(seed)
+        self.screen_h = screen_h
+        self.max_jump_height = max_jump_height
+        self.cat_size = cat_size
+        self.cat_image_count = cat_image_count
+        self.flower_color_count = flower_color_count
+        self.bush_variant_count = bush_variant_count
+        self.platform_gaps = platform_gaps
+        self.flower_spacing = flower_spacing
+        self.bush_spacing = bush_spacing
+        self.chunk_width = chunk_width
+
+        self.next_platform_x = PLATFORM_START_X
+        self.last_y = screen_h - 100
+        self.recent_platforms = []  # previous chunk's platforms, for overlap checks
+        self.blocking = SpatialHash(BLOCKING_CELL_SIZE)
+        self.chunk_rects = {}  # chunk index -> rects placed in self.blocking
+        self.next_index = 0
+
+    def generate(self):
+        # Chunks come out strictly left to right, so one RNG stream is enough
+        index = self.next_index
+        self.next_index += 1
+        x0 = index * self.chunk_width
+        x1 = x0 + self.chunk_width
+        ground_top = self.screen_h - GROUND_HEIGHT
+
+        platforms = list(self.recent_platforms)
+        self.next_platform_x, self.last_y = generate_platforms(
+            self.rng, platforms, self.next_platform_x, x1, self.last_y,
+            self.screen_h, self.max_jump_height, sys.maxsize, self.platform_gaps)
+        platforms = platforms[len(self.recent_platforms):]
+        self.recent_platforms = platforms
+
+        # Starting cats: a few on this chunk's ground, one per platform
+        placed = []
+        cats = []
+        ground = pygame.Rect(x0, ground_top, self.chunk_width, GROUND_HEIGHT)
+        ground_cats = INITIAL_GROUND_CATS if index == 0 else ENDLESS_GROUND_CATS
+        for surface in [ground] * ground_cats + platforms:
+            cat = spawn_cat(self.rng, self.blocking, surface, self.cat_size, self.cat_image_count)
+            if cat:
+                cat_rect, image = cat
+                self.blocking.insert(cat_rect)
+                placed.append(cat_rect)
+                cats.append((cat_rect.x, cat_rect.y, image))
+
+        flowers = generate_flowers(self.rng, self.blocking, _aligned(x0, self.flower_spacing), x1,
+                                   ground_top, self.flower_color_count, placed,
+                                   self.flower_spacing)
+        bushes = generate_bushes(self.rng, self.blocking, _aligned(x0, self.bush_spacing), x1,
+                                 ground_top, self.bush_variant_count, placed, self.bush_spacing)
+        self.chunk_rects[index] = placed
+
+        return {
+            "index": index,
+            "x0": x0,
+            "x1": x1,
+            "platforms": [tuple(p) for p in platforms],
+            "flowers": flowers,
+            "bushes": bushes,
+            "cats": cats
+        }
+
+    def forget(self, index):
+        # Drop a chunk's layout from the generator's own placement index
+        for rect in self.chunk_rects.pop(index, []):
+            self.blocking.remove(rect)
+
+    def state(self):
+        # Everything generate() carries over from one chunk to the next
+        return {
+            "next_index": self.next_index,
+            "next_platform_x": self.next_platform_x,
+            "last_y": self.last_y,
+            "random": self.rng.getstate(),
+            "recent_platforms": [tuple(p) for p in self.recent_platforms],
+            "chunk_rects": {index: [tuple(r) for r in rects]
+                            for index, rects in self.chunk_rects.items()}
+        }
+
+    def restore(self, state):
+        self.next_index = state["next_index"]
+        self.next_platform_x = state["next_platform_x"]
+        self.last_y = state["last_y"]
+        self.rng.setstate(state["random"])
+        self.recent_platforms = [pygame.Rect(p) for p in state["recent_platforms"]]
+        self.blocking = SpatialHash(BLOCKING_CELL_SIZE)
+        self.chunk_rects = {}
+        for index, rects in state["chunk_rects"].items():
+            placed = [pygame.Rect(r) for r in rects]
+            for rect in placed:
+                self.blocking.insert(rect)
+            self.chunk_rects[index] = placed
+
+
+# --------------------
+# Binary level cache
+# --------------------
+LEVEL_MAGIC = b"CCLL"
+LEVEL_VERSION = 1
+LEVEL_HEADER = struct.Struct("<4sHqIIIII")  # magic, version, seed, width, counts
+PLATFORM_RECORD = struct.Struct("<iiHH")    # x, y, w, h
+FLOWER_RECORD = struct.Struct("<iidB")      # x, y, sway angle, colour
+BUSH_RECORD = struct.Struct("<iiB")         # x, y, sprite variant
+CAT_RECORD = struct.Struct("<iiB")          # x, y, sprite
+
+
+def encode_level(level):
+    parts = [LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, level["seed"], level["world_width"],
+                               len(level["platforms"]), len(level["flowers"]),
+                               len(level["bushes"]), len(level["cats"]))]
+    parts += [PLATFORM_RECORD.pack(*p) for p in level["platforms"]]
+    parts += [FLOWER_RECORD.pack(*f) for f in level["flowers"]]
+    parts += [BUSH_RECORD.pack(*b) for b in level["bushes"]]
+    parts += [CAT_RECORD.pack(*c) for c in level["cats"]]
+    return b"".join(parts)
+
+
+def decode_level(data):
+    magic, version, seed, world_width, n_platforms, n_flowers, n_bushes, n_cats = \
+        LEVEL_HEADER.unpack_from(data)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError("not a level file of this version")
+
+    level = {"seed": seed, "world_width": world_width}
+    offset = LEVEL_HEADER.size
+    for key, record, count in (("platforms", PLATFORM_RECORD, n_platforms),
+                               ("flowers", FLOWER_RECORD, n_flowers),
+                               ("bushes", BUSH_RECORD, n_bushes),
+                               ("cats", CAT_RECORD, n_cats)):
+        end = offset + record.size * count
+        if end > len(data):
+            raise ValueError("truncated level file")
+        level[key] = list(record.iter_unpack(data[offset:end]))
+        offset = end
+    return level
+
+
+def level_cache_path(cache_dir, seed, params):
+    # Any change to the generator settings gives a different file
+    settings = (LEVEL_VERSION, sorted(params.items()), GROUND_HEIGHT, PLATFORM_START_X,
+                PLATFORM_END_MARGIN, PLATFORM_THICKNESS, MIN_PLATFORM_WIDTH,
+                MAX_PLATFORM_WIDTH, MIN_GAP, MAX_GAP, MIN_VERTICAL_GAP, FLOWER_W, FLOWER_H,
+                FLOWER_SPACING, BUSH_W, BUSH_H, BUSH_SPACING, INITIAL_GROUND_CATS,
+                PLACEMENT_PADDING, PLACEMENT_ATTEMPTS)
+    key = hashlib.sha1(repr(settings).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"level-{seed}-{key}.bin")
+
+
+def load_or_generate_level(cache_dir, seed, **params):
+    # Returns (level, True if it came from the cache); cache_dir None skips the cache
+    if cache_dir is None:
+        return generate_level(seed, **params), False
+
+    path = level_cache_path(cache_dir, seed, params)
+    try:
+        with open(path, "rb") as f:
+            return decode_level(f.read()), True
+    except (OSError, ValueError, struct.error):
+        pass
+
+    level = generate_level(seed, **params)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(encode_level(level))
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+    return level, False
@@ -1,29 +1,181 @@
-import pygame
-import sys
+import argparse
+from collections import deque
+import json
 import os
+import sys
+import time
 import random
 import math
 
-pygame.init()
+import pygame
 
-# Load and play background music
-pygame.mixer.init()  # make sure the mixer is initialized
-pygame.mixer.music.load("soundtrack.mp3")  # replace with your music file
-pygame.mixer.music.set_volume(0.5)       # volume from 0.0 to 1.0
-pygame.mixer.music.play(-1)              # -1 means loop forever
+from spatial import SpatialHash, XIndex, SlotIndex
+from sprite_cache import (build_flower_cache, flower_phase,
+                          FLOWER_ANCHOR_X, FLOWER_ANCHOR_Y,
+                          build_bush_variants, BUSH_ANCHOR_X, BUSH_ANCHOR_Y, ScaledSprites)
+from terrain import TerrainChunkCache
+from parallax import build_hill_layer, build_cloud_layer
+from input_script import ScriptedInput, DEFAULT_SCRIPT
+from asset_cache import load_scaled, last_stats as asset_stats, CACHE_DIR
+from audio import AudioManager
+from cat_pool import CatPool
+from text_cache import TextCache
+from particles import ParticleSystem, HEART, SPARKLE, DUST
+from profiler import FrameProfiler, summarize
+from quality import QualityGovernor
+from recording import InputRecorder, ReplayInput, load_recording, RECORDED_SETTINGS
+from snapshot import save_snapshot, load_snapshot
+from netplay import NetSession, parse_address, DEFAULT_PORT
+from level import (load_or_generate_level, ChunkGenerator, ENDLESS_CHUNK_WIDTH,
+                   GROUND_HEIGHT, BLOCKING_CELL_SIZE, PLACEMENT_PADDING, FLOWER_W, FLOWER_H, BUSH_W, BUSH_H,
+                   MIN_GAP, MAX_GAP, FLOWER_SPACING, BUSH_SPACING)
+
+startup_start = time.perf_counter()
 
+# --------------------
+# Run options
+# --------------------
+parser = argparse.ArgumentParser(description="Crazy Cat Lady")
+parser.add_argument("--headless", action="store_true",
+                    help="simulate without a window or sound, as fast as possible")
+parser.add_argument("--ticks", type=int, default=60 * 60 * 10,
+                    help="ticks to simulate in headless mode (60 per second)")
+parser.add_argument("--input", default=DEFAULT_SCRIPT,
+                    help="input script for headless mode, e.g. 'R90 RJ1 L30'")
+parser.add_argument("--seed", type=int, default=None,
+                    help="world seed (random if not given)")
+parser.add_argument("--endless", action="store_true",
+                    help="endless world generated ahead of the player")
+parser.add_argument("--max-fps", type=int, default=240,
+                    help="render frame rate cap, 0 for uncapped")
+parser.add_argument("--profile", metavar="PATH", default=None,
+                    help="profile every frame and write the timings to PATH on exit "
+                         "(.json for a summary, anything else for per-frame CSV)")
+parser.add_argument("--render", action="store_true",
+                    help="headless: also draw every tick to the dummy display")
+parser.add_argument("--report", metavar="PATH", default=None,
+                    help="headless: write startup, generation, simulation and render "
+                         "timings to PATH as JSON")
+parser.add_argument("--no-level-cache", action="store_true",
+                    help="always generate the level, even for a given seed")
+parser.add_argument("--quality", default="auto", choices=["auto", "0", "1", "2", "3", "4"],
+                    help="auto adapts to the frame rate; 0 (full) to 4 (lowest) fixes it")
+parser.add_argument("--render-scale", type=float, default=0.5,
+                    help="internal resolution of the lowest quality tier, relative to the window")
+parser.add_argument("--record", metavar="PATH", default=None,
+                    help="record the seed and every tick's movement keys to PATH")
+parser.add_argument("--replay", metavar="PATH", default=None,
+                    help="replay a recording (in real time, or as fast as possible "
+                         "with --headless) and check the final state matches")
+parser.add_argument("--snapshot", metavar="PATH", default=None,
+                    help="start from a saved snapshot (its seed and world settings win)")
+parser.add_argument("--save-snapshot", metavar="PATH", default=None,
+                    help="write a snapshot of the game state to PATH on exit")
+parser.add_argument("--host", metavar="ADDR", nargs="?", const=f"127.0.0.1:{DEFAULT_PORT}",
+                    default=None,
+                    help=f"host a two-player game on ADDR (default 127.0.0.1:{DEFAULT_PORT})")
+parser.add_argument("--join", metavar="ADDR", default=None,
+                    help="join a two-player game; the host's seed and world settings win")
+parser.add_argument("--net-timeout", type=float, default=30.0, metavar="SECONDS",
+                    help="give up joining, or waiting for a guest in headless mode, "
+                         "after SECONDS (default 30)")
+
+# World scaling, mostly for benchmark.py
+parser.add_argument("--world-width", type=int, default=4000,
+                    help="level width in pixels (ignored in endless mode)")
+parser.add_argument("--max-cats", type=int, default=8,
+                    help="most uncollected cats before respawning stops")
+parser.add_argument("--spawn-window", type=int, default=None, metavar="PX",
+                    help="respawn cats within PX of the screen when there is room "
+                         "(default: anywhere in the world)")
+parser.add_argument("--platform-density", type=float, default=1.0,
+                    help="platform density multiplier (gaps between platforms shrink)")
+parser.add_argument("--decor-density", type=float, default=1.0,
+                    help="flower and bush density multiplier")
+args = parser.parse_args()
+if args.platform_density <= 0 or args.decor_density <= 0:
+    parser.error("--platform-density and --decor-density must be greater than 0")
+if not 0 < args.render_scale <= 1:
+    parser.error("--render-scale must be greater than 0 and at most 1")
+if args.snapshot and (args.record or args.replay):
+    parser.error("--snapshot can't be combined with --record or --replay")
+if args.host and args.join:
+    parser.error("--host and --join are mutually exclusive")
+if (args.host or args.join) and (args.endless or args.record or args.replay or args.snapshot):
+    parser.error("two-player games can't be endless, recorded, replayed or start from a snapshot")
+
+# A replay brings back the seed and world settings it was recorded with
+replay = None
+if args.replay:
+    try:
+        replay = load_recording(args.replay)
+    except (OSError, ValueError) as e:
+        print(f"replay: {e}")  # the message already names the file
+        sys.exit(1)
+    args.seed = replay["seed"]
+    args.ticks = replay["ticks"]
+    for key in RECORDED_SETTINGS:
+        setattr(args, key, replay[key])
+
+# So does a snapshot; the rest of it is applied once the world exists
+start_snapshot = None
+if args.snapshot:
+    try:
+        start_snapshot = load_snapshot(args.snapshot)
+    except (OSError, ValueError) as e:
+        print(f"snapshot: {e}")  # the message already names the file
+        sys.exit(1)
+    args.seed = start_snapshot["seed"]
+    for key in RECORDED_SETTINGS:
+        setattr(args, key, start_snapshot[key])
+
+# And so does the host of a two-player game
+net = None
+welcome = None
+if args.join:
+    try:
+        net, welcome = NetSession.join(*parse_address(args.join), timeout=args.net_timeout)
+    except (OSError, ValueError) as e:
+        print(f"net: can't join {args.join}: {e}")
+        sys.exit(1)
+    args.seed = welcome["seed"]
+    for key in RECORDED_SETTINGS:
+        setattr(args, key, welcome["settings"][key])
+    print(f"net: joined {args.join}")
+elif args.host:
+    net = NetSession.host(*parse_address(args.host))
+    print("net: hosting on {}:{}".format(*net.address))
+
+HEADLESS = args.headless
+ENDLESS = args.endless
+
+if HEADLESS:
+    # SDL still needs a display for convert_alpha(), so give it a fake one
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
 
-meow_sounds = [
-   pygame.mixer.Sound("catmeow.mp3")
-]
+pygame.init()
 
-for sound in meow_sounds:
-    sound.set_volume(0.6)
+# --------------------
+# Audio
+# --------------------
+# Music and sounds decode in the background while the window comes up
+SOUND_CHANNELS = 8
+audio = None
+if not HEADLESS:
+    audio = AudioManager(SOUND_CHANNELS, cache_dir=CACHE_DIR)
+    audio.load_async(
+        {"meow": ("catmeow.mp3", 0.6, 1)},      # name: (file, volume, priority)
+        music=("soundtrack.mp3", 0.5)           # replace with your music file
+    )
 
 # --------------------
 # Window
 # --------------------
 WIDTH, HEIGHT = 800, 450
+# The camera clamp and the ground both assume the world fills the window
+if args.world_width < WIDTH:
+    parser.error(f"--world-width must be at least {WIDTH}")
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Crazy Cat Lady")
 clock = pygame.time.Clock()
@@ -37,11 +189,22 @@ HILL_COLOR = (120, 180, 120)    # darker hills
 CLOUD_COLOR = (255, 255, 255, 200)
 FLOWER_COLOR = (255, 150, 200)
 BUSH_COLOR = (100, 150, 100)
+FLOWER_COLORS = [
+    (255, 160, 190),
+    (255, 220, 120),
+    (180, 200, 255),
+    (220, 180, 255)
+]
 
 # --------------------
 # World settings
 # --------------------
-WORLD_WIDTH = 4000
+WORLD_WIDTH = args.world_width
+BUSH_VARIANTS = 4  # baked bush looks; 1 for identical bushes everywhere
+
+# Playable span; in endless mode both edges move as chunks stream in and out
+world_left = 0
+world_right = 0 if ENDLESS else WORLD_WIDTH
 
 # --------------------
 # Player
@@ -55,23 +218,41 @@ gravity = 0.8
 on_ground = False
 
 # --------------------
-# Load player frames
+# Load sprites
 # --------------------
-player_frames = {"walk": [], "jump": [], "idle": []}
+# Every sprite goes through the scaled sprite cache in one batch, so cold
+# starts decode in parallel and warm starts skip decoding and scaling
 frame_folder = "player_frames"
 TARGET_WIDTH = 40
 TARGET_HEIGHT = 60
 
-for filename in sorted(os.listdir(frame_folder)):
-    if filename.endswith(".png"):
-        img = pygame.image.load(os.path.join(frame_folder, filename)).convert_alpha()
-        img = pygame.transform.scale(img, (TARGET_WIDTH, TARGET_HEIGHT))
-        if filename.startswith("walk"):
-            player_frames["walk"].append(img)
-        elif filename.startswith("jump"):
-            player_frames["jump"].append(img)
-        elif filename.startswith("idle") or filename == "idle.png":
-            player_frames["idle"].append(img)
+cat_folder = "cat_sprites"
+target_height = 50  # desired cat height
+
+BASKET_HEIGHT = 32
+
+frame_files = [f for f in sorted(os.listdir(frame_folder)) if f.endswith(".png")]
+cat_files = [os.path.join(cat_folder, f"cat{i}.png") for i in range(1, 7)]
+sprite_jobs = ([(os.path.join(frame_folder, f), (TARGET_WIDTH, TARGET_HEIGHT)) for f in frame_files]
+               + [(path, (None, target_height)) for path in cat_files]
+               + [("basket.png", (None, BASKET_HEIGHT))])
+sprites = load_scaled(sprite_jobs)
+print(f"assets: {len(sprites)} sprites in {asset_stats['seconds'] * 1000:.1f} ms "
+      f"({asset_stats['hits']} cached, {asset_stats['misses']} decoded)")
+
+# --------------------
+# Player frames
+# --------------------
+player_frames = {"walk": [], "jump": [], "idle": []}
+ANIMATIONS = ("idle", "walk", "jump")  # saved and sent as an index
+
+for filename, img in zip(frame_files, sprites):
+    if filename.startswith("walk"):
+        player_frames["walk"].append(img)
+    elif filename.startswith("jump"):
+        player_frames["jump"].append(img)
+    elif filename.startswith("idle") or filename == "idle.png":
+        player_frames["idle"].append(img)
 # =============================
 # Initialize frames safely
 # =============================
@@ -83,154 +264,139 @@ frame_speed = 10
 # --------------------
 # Ground
 # --------------------
-ground_rect = pygame.Rect(0, HEIGHT - 60, WORLD_WIDTH, 60)
+ground_rect = pygame.Rect(0, HEIGHT - GROUND_HEIGHT, world_right, GROUND_HEIGHT)
 
 # --------------------
 # Spawn blocking rect
 # --------------------
-blocking_rects = []
-
-def can_place(rect, padding=6):
-    test = rect.inflate(padding, padding)
-
-    # Check static blocked areas
-    for r in blocking_rects:
-        if test.colliderect(r):
-            return False
+# Flowers, bushes and uncollected cats all live in one grid index,
+# so a placement test only looks at the cells around the candidate rect
+blocking_index = SpatialHash(BLOCKING_CELL_SIZE)
 
-    # Check active (uncollected) cats
-    for cat in cats:
-        if not cat["collected"] and test.colliderect(cat["rect"]):
-            return False
-
-    return True
+def register_rect(rect):
+    blocking_index.insert(rect)
+    spawn_slots.block(rect)
 
 
-def register_rect(rect):
-    blocking_rects.append(rect)
+def unregister_rect(rect):
+    blocking_index.remove(rect)
+    spawn_slots.unblock(rect)
 
 
 # --------------------
-# Bushes
+# Cat sprites
 # --------------------
-def draw_bush(screen, bush_rect, camera_x):
-    base_x = bush_rect.x - camera_x
-    base_y = bush_rect.y + bush_rect.height  # anchor to ground
-
-    greens = [
-        (95, 140, 95),
-        (85, 130, 85),
-        (75, 120, 75)
-    ]
-
-    circles = [
-        (-5, -8, 10),
-        (8, -14, 14),
-        (22, -10, 12),
-        (4, -20, 12),
-        (16, -22, 10)
-    ]
-
-    for i, (dx, dy, r) in enumerate(circles):
-        pygame.draw.circle(
-            screen,
-            greens[i % len(greens)],
-            (int(base_x + dx), int(base_y + dy)),
-            r
-        )
+cat_images = sprites[len(frame_files):len(frame_files) + len(cat_files)]
+cat_size = target_height
 
+# Free spots for respawned cats on the ground and every platform, kept in
+# step with the blocking index
+spawn_slots = SlotIndex(blocking_index, cat_size, cat_size, PLACEMENT_PADDING)
+spawn_slots.add_surface(ground_rect)
 
 # --------------------
-# Platforms (varied, reachable, non-overlapping, fully separated)
+# World layout (seeded, cached per seed)
 # --------------------
-platforms = []
-x = 500
-MIN_PLATFORM_WIDTH = 80
-MAX_PLATFORM_WIDTH = 150
-MIN_GAP = 100
-MAX_GAP = 250
 MAX_JUMP_HEIGHT = abs(jump_strength * 1.5 / gravity)
-MIN_VERTICAL_GAP = 20  # pixels between any two platforms
 
-last_y = HEIGHT - 100  # starting near the ground
-
-while x < WORLD_WIDTH - 200:
-    width = random.randint(MIN_PLATFORM_WIDTH, MAX_PLATFORM_WIDTH)
-    height = HEIGHT - random.randint(120, 250)
-
-    # Clamp height to be reachable from previous platform
-    if last_y - height > MAX_JUMP_HEIGHT:
-        height = last_y - int(MAX_JUMP_HEIGHT)
-
-    base_platform = pygame.Rect(x, height, width, 10)
-    platforms.append(base_platform)
-
-    # Occasionally add a nearby higher platform
-    if random.random() < 0.3:
-        higher_width = random.randint(60, 120)
-        offset_x = random.randint(-50, 50)
-        offset_y = random.randint(20, int(MAX_JUMP_HEIGHT - 10))
-        higher_x = max(0, min(x + offset_x, WORLD_WIDTH - higher_width))
-        higher_y = max(50, height - offset_y)
+world_seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+layout_params = dict(
+    screen_h=HEIGHT, max_jump_height=MAX_JUMP_HEIGHT,
+    cat_size=cat_size, cat_image_count=len(cat_images),
+    flower_color_count=len(FLOWER_COLORS), bush_variant_count=BUSH_VARIANTS,
+    platform_gaps=(max(1, int(MIN_GAP / args.platform_density)),
+                   max(1, int(MAX_GAP / args.platform_density))),
+    flower_spacing=max(1, int(FLOWER_SPACING / args.decor_density)),
+    bush_spacing=max(1, int(BUSH_SPACING / args.decor_density))
+)
 
-        new_higher = pygame.Rect(higher_x, higher_y, higher_width, 10)
+if ENDLESS:
+    # Chunks are generated as the camera approaches them
+    level = None
+    chunk_generator = ChunkGenerator(world_seed, **layout_params)
+    print(f"world: seed {world_seed}, endless")
+else:
+    # Only levels asked for by seed are worth keeping on disk
+    level_cache_dir = None
+    if args.seed is not None and not args.no_level_cache:
+        level_cache_dir = os.path.join(CACHE_DIR, "levels")
+    level_start = time.perf_counter()
+    level, level_cached = load_or_generate_level(level_cache_dir, world_seed,
+                                                 world_width=WORLD_WIDTH, **layout_params)
+    generation_ms = (time.perf_counter() - level_start) * 1000
+    print(f"world: seed {world_seed} {'loaded from cache' if level_cached else 'generated'} "
+          f"in {generation_ms:.1f} ms")
+
+# Runtime randomness gets its own seeded streams, so a seed also fixes
+# where cats respawn and how the background looks
+spawn_rng = random.Random(f"{world_seed}:spawns")
+background_rng = random.Random(f"{world_seed}:background")
 
-        # Only add if it does not overlap ANY existing platform (horizontal OR vertical)
-        conflict = False
-        for p in platforms:
-            if new_higher.colliderect(p) or abs(new_higher.top - p.bottom) < MIN_VERTICAL_GAP or abs(new_higher.bottom - p.top) < MIN_VERTICAL_GAP:
-                conflict = True
-                break
+# --------------------
+# Platforms
+# --------------------
+platforms = []
+platform_index = XIndex()  # broad phase for player collisions
 
-        if not conflict:
-            platforms.append(new_higher)
+def add_platform(rect):
+    plat = pygame.Rect(rect)
+    platforms.append(plat)
+    platform_index.insert(plat)
+    spawn_slots.add_surface(plat)
+    return plat
 
-    last_y = height
-    x += width + random.randint(MIN_GAP, MAX_GAP)
 
 # --------------------
-# Load cat sprites
+# Cat spawning control
 # --------------------
-cat_images = []
-cat_folder = "cat_sprites"
-target_height = 50  # desired height
-cat_size = target_height
-for i in range(1, 7):
-    img = pygame.image.load(os.path.join(cat_folder, f"cat{i}.png")).convert_alpha()
-    scale_factor = target_height / img.get_height()
-    target_width = int(img.get_width() * scale_factor)
-    img = pygame.transform.scale(img, (target_width, target_height))
-    cat_images.append(img)
+MAX_CATS_ON_SCREEN = args.max_cats
+SPAWN_WINDOW = args.spawn_window  # None: respawn anywhere
+spawn_timer = 0
+spawn_interval = 200  # spawn rate
 
 # --------------------
-# Cats list
+# Cats
 # --------------------
-cats = []
-
-def spawn_cats_on_surface(surface_rect, count=1):
-    active_cats = [c for c in cats if not c["collected"]]
+# Only uncollected cats exist; collected ones go straight back to the pool.
+# The pool is sized once: room for every starting cat plus the respawns.
+CAT_POOL_CAPACITY = 64
+if level:
+    CAT_POOL_CAPACITY = max(CAT_POOL_CAPACITY, len(level["cats"]) + MAX_CATS_ON_SCREEN)
+cat_pool = CatPool(CAT_POOL_CAPACITY)
+active_cat_index = XIndex()  # uncollected cats only, sorted by x
+
+def add_cat(cat_rect, image, uid=None):
+    cat = cat_pool.acquire(cat_rect, image, uid)
+    if cat is None:
+        return None
+    active_cat_index.insert(cat_rect, cat)
+    register_rect(cat_rect)  # Block this spot for future spawns
+    return cat
+
+
+def remove_cat(cat):
+    active_cat_index.remove(cat.rect, cat)
+    unregister_rect(cat.rect)
+    cat_pool.release(cat)
+
+
+def spawn_cats(count=1):
     for _ in range(count):
-        if surface_rect.width >= cat_size:
-            for attempt in range(10):
-                x = surface_rect.x + random.randint(0, surface_rect.width - cat_size)
-                cat_rect = pygame.Rect(x, 0, cat_size, cat_size)
-                cat_rect.bottom = surface_rect.top if surface_rect != ground_rect else ground_rect.top
-
-                # Only place if it does NOT collide with anything
-                if can_place(cat_rect):
-                    cats.append({
-                        "rect": cat_rect,
-                        "image": random.choice(cat_images),
-                        "collected": False
-                    })
-                    register_rect(cat_rect)  # Block this spot for future spawns
-                    break
-
-
-# Spawn initial cats
-spawn_cats_on_surface(ground_rect, count=3)
-for plat in platforms:
-    spawn_cats_on_surface(plat, count=1)
+        if not cat_pool.free:
+            return
+        cat_rect = None
+        if SPAWN_WINDOW is not None:
+            view_x = int(camera_x)
+            cat_rect = spawn_slots.pick_within(spawn_rng, view_x - SPAWN_WINDOW,
+                                               view_x + WIDTH + SPAWN_WINDOW)
+        if cat_rect is None:
+            cat_rect = spawn_slots.pick(spawn_rng)
+        if cat_rect is None:
+            return
+        cat = add_cat(cat_rect, spawn_rng.randrange(len(cat_images)))
+        if net and cat:
+            net_spawned.append((cat.uid, cat.rect.x, cat.rect.y, cat.image))
+
 
 cat_count = 0
 
@@ -243,25 +409,19 @@ camera_x = 0
 # Font for counter
 # --------------------
 font = pygame.font.SysFont(None, 36)
+text_cache = TextCache()
 
 # --------------------
 # Basket icon
 # --------------------
-basket_img = pygame.image.load("basket.png").convert_alpha()
-
-BASKET_HEIGHT = 32
-scale = BASKET_HEIGHT / basket_img.get_height()
-basket_img = pygame.transform.scale(
-    basket_img,
-    (int(basket_img.get_width() * scale), BASKET_HEIGHT)
-)
+basket_img = sprites[-1]
 
 
 # --------------------
 # Parallax backgrounds
 # --------------------
-bg_sky = pygame.Surface((WORLD_WIDTH, HEIGHT))
-bg_sky.fill((180, 220, 255))  # light blue sky
+# Strips wrap seamlessly, so they only need to be a little wider than the window
+PARALLAX_STRIP_WIDTH = WIDTH * 2
 
 # --------------------
 # Layered Hills with drifting fog and trees
@@ -272,148 +432,286 @@ hill_layers = [
     ((115, 170, 115), 130, 140, 200, 220, 0.5)  # near hills
 ]
 
-
-
 bg_hills = []
+for index, (color, y_offset, min_h, max_h, spacing, parallax) in enumerate(hill_layers):
+    bg_hills.append(build_hill_layer(background_rng, PARALLAX_STRIP_WIDTH, HEIGHT, index, color,
+                                     y_offset, min_h, max_h, spacing, parallax))
 
 
-for index, (color, y_offset, min_h, max_h, spacing, parallax) in enumerate(hill_layers):
-    surface = pygame.Surface((WORLD_WIDTH, HEIGHT), pygame.SRCALPHA)
-    # Solid base to prevent sky gaps between hills
-    pygame.draw.rect(
-       surface,
-       color,
-       (0, HEIGHT - y_offset + min_h // 2, WORLD_WIDTH, HEIGHT)
-)
+# Clouds layer (all clouds pre-composited into one drifting strip)
+CLOUD_ALPHA = 180
+CLOUD_PARALLAX = 0.3
+CLOUD_DRIFT_SPEED = 0.2  # average of the old per-cloud 0.1-0.3 speeds
+cloud_layer = build_cloud_layer(background_rng, PARALLAX_STRIP_WIDTH, CLOUD_COLOR,
+                                CLOUD_ALPHA, CLOUD_PARALLAX)
+cloud_drift = 0.0
 
 
-    x = -spacing
-    while x < WORLD_WIDTH + spacing:
-        base_width = random.randint(260, 420)
-        base_height = random.randint(min_h, max_h)
-        base_y = HEIGHT - y_offset
+def draw_hills(surface, view_x, layers):
+    for layer in layers:
+        layer.draw(surface, view_x * layer.parallax)
 
-        # Draw main hill
-        pygame.draw.ellipse(surface, color, (x, base_y, base_width, base_height))
 
-        # Add small wobble only for mid/near hills
-        if index != 0:
-            for _ in range(random.randint(1, 2)):
-                wobble_w = base_width + random.randint(-60, 60)
-                wobble_h = base_height + random.randint(-30, 30)
-                wobble_x = x + random.randint(-40, 40)
-                wobble_y = base_y + random.randint(-20, 20)
-                pygame.draw.ellipse(surface, color, (wobble_x, wobble_y, wobble_w, wobble_h))
+def draw_clouds(surface, view_x, drift, layer):
+    layer.draw(surface, view_x * layer.parallax - drift * layer.scale)
 
-   
 
-        x += spacing + random.randint(-60, 60)
+def draw_background(surface, view_x, drift):
+    draw_hills(surface, view_x, bg_hills)
+    draw_clouds(surface, view_x, drift, cloud_layer)
 
-    bg_hills.append({"surface": surface, "parallax": parallax})
 
+# --------------------
+# Foreground flowers & bushes
+# --------------------
+flowers = []
+flower_index = XIndex()
+
+def add_flower(x, y, angle, color):
+    rect = pygame.Rect(x - FLOWER_W // 2, y - FLOWER_H, FLOWER_W, FLOWER_H)
+    register_rect(rect)
+    flower = {
+        "x": x,
+        "y": y,
+        "angle": angle,
+        "color": FLOWER_COLORS[color],
+        "rect": rect
+    }
+    flowers.append(flower)
+    flower_index.insert(rect, flower)
+    return flower
 
+# Every colour pre-rendered at each sway phase
+flower_frames = build_flower_cache(FLOWER_COLORS)
 
 
+# Bushes never change, so each one is baked once
+bush_sprites = build_bush_variants(BUSH_VARIANTS, background_rng)
 
+bushes = []
+bush_index = XIndex()
+def add_bush(x, y, variant):
+    rect = pygame.Rect(x, y, BUSH_W, BUSH_H)
+    register_rect(rect)
+    bush = {
+        "rect": rect,
+        "sprite": bush_sprites[variant]
+    }
+    bushes.append(bush)
+    bush_index.insert(rect, bush)
+    return bush
 
-# Clouds layer
-clouds = []
-for i in range(0, WORLD_WIDTH, 250):
-    cx = i + random.randint(-20, 20)
-    cy = 50 + random.randint(-20, 20)
 
-    # Random cloud size
-    cloud_w = random.randint(120, 200)
-    cloud_h = random.randint(60, 100)
+# --------------------
+# Particles
+# --------------------
+PARTICLE_CAP = 512
+HEART_BURST = 6
+SPARKLE_BURST = 10
+LANDING_DUST_SPEED = 6  # softer landings kick up no dust
 
-    cloud_surface = pygame.Surface((cloud_w, cloud_h), pygame.SRCALPHA)
+particles = ParticleSystem(PARTICLE_CAP)
 
-    # --- Base cloud body (guarantees visibility) ---
-    pygame.draw.ellipse(
-        cloud_surface,
-        CLOUD_COLOR,
-        (int(cloud_w * 0.1), int(cloud_h * 0.3),
-         int(cloud_w * 0.8), int(cloud_h * 0.6))
-    )
 
-    # --- Additional fluffy blobs ---
-    blob_count = random.randint(3, 6)
-    for _ in range(blob_count):
-        w = random.randint(cloud_w // 4, cloud_w // 2)
-        h = random.randint(cloud_h // 3, int(cloud_h * 0.8))
+# --------------------
+# Viewport culling
+# --------------------
+# How far each kind of object can draw outside its rect
+FLOWER_DRAW_MARGIN = 10  # sway + petals
+BUSH_DRAW_MARGIN = 20    # outer leaf circles plus variant jitter
 
-        max_x = max(0, cloud_w - w)
-        max_y = max(0, cloud_h - h)
+cull_stats = {"drawn": 0, "culled": 0}
+show_cull_stats = False
 
-        x = random.randint(0, max_x)
-        y = random.randint(int(cloud_h * 0.15), max_y)
+def visible(index, view_x, margin=0):
+    items = index.query(view_x - margin, view_x + WIDTH + margin)
+    cull_stats["drawn"] += len(items)
+    cull_stats["culled"] += len(index) - len(items)
+    return items
 
-        pygame.draw.ellipse(
-            cloud_surface,
-            CLOUD_COLOR,
-            (x, y, w, h)
-        )
-    cloud_surface.set_alpha(180)
 
-    clouds.append({
-        "surface": cloud_surface,
-        "x": cx,
-        "y": cy,
-        "speed": random.uniform(0.1, 0.3)
-        
-    })
+# --------------------
+# Frame profiler (F4)
+# --------------------
+# Every phase below ends with profiler.lap(); the checks on profiler.enabled
+# keep it free when nobody is looking. Ground, platforms and bushes are baked
+# into the same terrain chunks, so they are timed together.
+PROFILE_PHASES = ["events", "input", "movement", "platforms", "collection", "spawning",
+                  "camera", "animation", "particle update", "hills", "clouds", "terrain",
+                  "flowers", "cats", "player", "particles", "upscale", "hud", "flip"]
+PROFILE_OVERLAY_REFRESH = 30  # frames between overlay redraws
+
+profiler = FrameProfiler(PROFILE_PHASES, enabled=args.profile is not None)
+show_profile = False
+profile_font = pygame.font.SysFont(None, 20)
+profile_overlay = None
+
+def render_profile_overlay():
+    # Numbers change every refresh, so these bypass the text cache
+    stats = profiler.stats()
+    rows = [["phase (ms)", "p50", "p95", "p99"]]
+    for name in PROFILE_PHASES + ["total"]:
+        s = stats[name]
+        rows.append([name, f"{s['p50']:.2f}", f"{s['p95']:.2f}", f"{s['p99']:.2f}"])
+
+    # Name column left-aligned, numbers right-aligned
+    name_w, col_w = 90, 45
+    line_h = profile_font.get_linesize()
+    panel = pygame.Surface((name_w + 3 * col_w + 16, line_h * len(rows) + 12), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 150))
+    for i, row in enumerate(rows):
+        y = 6 + i * line_h
+        panel.blit(profile_font.render(row[0], True, (255, 255, 255)), (8, y))
+        for col, value in enumerate(row[1:]):
+            text = profile_font.render(value, True, (255, 255, 255))
+            panel.blit(text, (8 + name_w + (col + 1) * col_w - text.get_width(), y))
+    return panel
+
+
+def draw_profile_overlay(surface):
+    global profile_overlay
+    if profile_overlay is None or profiler.frames % PROFILE_OVERLAY_REFRESH == 0:
+        profile_overlay = render_profile_overlay()
+    surface.blit(profile_overlay, (WIDTH - profile_overlay.get_width() - 10, 50))
+
+
+def toggle_profile_overlay():
+    global show_profile
+    show_profile = not show_profile
+    was_enabled = profiler.enabled
+    # --profile keeps recording with the overlay hidden
+    profiler.enabled = show_profile or args.profile is not None
+    if profiler.enabled and not was_enabled:
+        profiler.begin_frame()
 
 
 # --------------------
-# Foreground flowers & bushes
+# Static terrain chunks
 # --------------------
-flowers = []
-FLOWER_W, FLOWER_H = 20, 30
-
-for i in range(0, WORLD_WIDTH, 140):
-    for _ in range(10):
-        x = i + random.randint(0, 60)
-        y = HEIGHT - 60
-        rect = pygame.Rect(x - FLOWER_W // 2, y - FLOWER_H, FLOWER_W, FLOWER_H)
-
-        if can_place(rect):
-            register_rect(rect)
-            flowers.append({
-                "x": x,
-                "y": y,
-                "angle": random.uniform(0, math.pi * 2),
-                "color": random.choice([
-                    (255, 160, 190),
-                    (255, 220, 120),
-                    (180, 200, 255),
-                    (220, 180, 255)
-                ]),
-                "rect": rect
-            })
-            break
+TERRAIN_CHUNK_WIDTH = 512
 
+def render_terrain_chunk(surface, x0):
+    x1 = x0 + TERRAIN_CHUNK_WIDTH
 
-bushes = []
-for i in range(0, WORLD_WIDTH, 300):
-    for _ in range(10):
-        rect = pygame.Rect(i + random.randint(0, 50), HEIGHT - 70, 30, 20)
-        if can_place(rect):
-            register_rect(rect)
-            bushes.append(rect)
-            break
+    # Ground
+    pygame.draw.rect(surface, GROUND_COLOR,
+                     pygame.Rect(ground_rect.x - x0, ground_rect.y,
+                                 ground_rect.width, ground_rect.height),
+                     border_radius=20)
+
+    # Platforms
+    for plat in platform_index.query(x0, x1):
+        pygame.draw.rect(surface, (200, 180, 240),
+                         pygame.Rect(plat.x - x0, plat.y, plat.width, plat.height),
+                         border_radius=5)
+
+    # Bushes
+    for bush in bush_index.query(x0 - BUSH_DRAW_MARGIN, x1 + BUSH_DRAW_MARGIN):
+        surface.blit(bush["sprite"], (bush["rect"].x - x0 - BUSH_ANCHOR_X,
+                                      bush["rect"].bottom - BUSH_ANCHOR_Y))
+
+terrain_cache = TerrainChunkCache(render_terrain_chunk, HEIGHT, TERRAIN_CHUNK_WIDTH)
 
 
 # --------------------
-# Cat spawning control
+# World contents
 # --------------------
-MAX_CATS_ON_SCREEN = 8
-spawn_timer = 0
-spawn_interval = 200  # spawn rate
+def add_layout(layout):
+    # Builds game objects from level or chunk data and returns them
+    return {
+        "layout": layout,
+        "platforms": [add_platform(p) for p in layout["platforms"]],
+        "cats": [add_cat(pygame.Rect(x, y, cat_size, cat_size), image)
+                 for x, y, image in layout["cats"]],
+        "flowers": [add_flower(*f) for f in layout["flowers"]],
+        "bushes": [add_bush(*b) for b in layout["bushes"]]
+    }
+
+
+def remove_layout(objects):
+    # Takes add_layout()'s platforms, flowers and bushes back out of the
+    # indexes; callers trim the lists themselves
+    for plat in objects["platforms"]:
+        platform_index.remove(plat)
+        spawn_slots.remove_surface(plat)
+    for flower in objects["flowers"]:
+        flower_index.remove(flower["rect"], flower)
+        unregister_rect(flower["rect"])
+    for bush in objects["bushes"]:
+        bush_index.remove(bush["rect"], bush)
+        unregister_rect(bush["rect"])
+
+
+# --------------------
+# Endless world streaming
+# --------------------
+# Chunks are generated a chunk ahead of the screen and dropped, with all their
+# cats and blocking rects, once they are well behind it. The player can't
+# walk back into dropped chunks, so memory and frame time stay flat.
+STREAM_AHEAD = ENDLESS_CHUNK_WIDTH
+STREAM_BEHIND = ENDLESS_CHUNK_WIDTH // 2
+GROUND_CORNER = 20  # rounded end of the ground, redrawn when the ground grows
+world_chunks = deque()
+
+def load_next_chunk():
+    global world_right
+    layout = chunk_generator.generate()
+    chunk = add_layout(layout)
+    chunk["index"] = layout["index"]
+    chunk["x1"] = layout["x1"]
+    world_chunks.append(chunk)
+
+    old_right = world_right
+    world_right = layout["x1"]
+    ground_rect.width = world_right - ground_rect.x
+    spawn_slots.resize_surface(ground_rect)
+    terrain_cache.invalidate(old_right - GROUND_CORNER, world_right)
+
+
+def evict_chunk(chunk):
+    global world_left
+    # Chunks are evicted oldest first, so their objects are at the front of
+    # the lists; platforms that overhang the chunk push the new left edge out
+    del platforms[:len(chunk["platforms"])]
+    del flowers[:len(chunk["flowers"])]
+    del bushes[:len(chunk["bushes"])]
+    world_left = max([chunk["x1"]] + [p.right for p in chunk["platforms"]])
+    remove_layout(chunk)
+
+    # Starting and respawned cats alike
+    for cat in cat_pool:
+        if cat.rect.left < world_left:
+            remove_cat(cat)
+
+    chunk_generator.forget(chunk["index"])
+    ground_rect.width = world_right - world_left
+    ground_rect.x = world_left
+    spawn_slots.resize_surface(ground_rect)
+    terrain_cache.invalidate(world_left, world_left + GROUND_CORNER)
+
+
+def stream_world():
+    while world_right < camera_x + WIDTH + STREAM_AHEAD:
+        load_next_chunk()
+    while len(world_chunks) > 1 and world_chunks[0]["x1"] < camera_x - STREAM_BEHIND:
+        evict_chunk(world_chunks.popleft())
+
+
+if ENDLESS:
+    # The first chunks stand in for level generation in reports
+    stream_start = time.perf_counter()
+    stream_world()
+    generation_ms = (time.perf_counter() - stream_start) * 1000
+else:
+    add_layout(level)
+
+startup_ms = (time.perf_counter() - startup_start) * 1000
 
 # --------------------
 # TITLE SCREEN (CLEAN VERSION)
 # --------------------
 def title_screen():
+    global cloud_drift
     pulse_timer = 0
     running_title = True
 
@@ -426,6 +724,13 @@ def title_screen():
     button_rect = pygame.Rect(WIDTH // 2 - 130, HEIGHT // 2 + 50, 260, 60)
     button_color_default = (255, 180, 200)  # pastel pink
     button_color_hover = (200, 180, 255)    # pastel purple
+    button_area = button_rect.inflate(20, 20)  # biggest the pulse + hover gets
+
+    # Sky, hills, clouds and title only change when the clouds drift a whole
+    # pixel, so they are composed off-screen and only the button area is
+    # pushed to the display in between
+    title_background = pygame.Surface((WIDTH, HEIGHT))
+    background_scroll = None
 
     while running_title:
         clock.tick(60)
@@ -444,33 +749,36 @@ def title_screen():
             if event.type == pygame.KEYDOWN:
                 running_title = False
 
-        # --------------------
-        # Background
-        # --------------------
-        screen.fill((180, 220, 255))  # sky
-
-        # Hills (same as game)
-        for layer in bg_hills:
-            screen.blit(layer["surface"], (-camera_x * layer["parallax"], 0))
-
-        # Clouds (slower drift for calm effect)
-        for cloud in clouds:
-            cloud["x"] += cloud["speed"] * 0.2
-            if cloud["x"] > WORLD_WIDTH:
-                cloud["x"] = -150
-            screen.blit(cloud["surface"], (cloud["x"] - camera_x * 0.3, cloud["y"]))
-
-        # --------------------
-        # Title text (cute + shadow)
-        # --------------------
-        # Shadow
-        shadow_text = title_font.render(title_str, True, (200, 180, 200))
-        screen.blit(shadow_text, (WIDTH//2 - shadow_text.get_width()//2 + 3,
-                                  HEIGHT//3 + 3))
-
-        # Main color
-        title_text = title_font.render(title_str, True, (255, 180, 220))
-        screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//3))
+        # Hills and clouds (same as game, slower drift for calm effect)
+        cloud_drift += CLOUD_DRIFT_SPEED * 0.2
+        scroll = int(camera_x * cloud_layer.parallax - cloud_drift)
+        full_redraw = scroll != background_scroll
+
+        if full_redraw:
+            background_scroll = scroll
+
+            # --------------------
+            # Background
+            # --------------------
+            title_background.fill((180, 220, 255))  # sky
+            draw_background(title_background, camera_x, cloud_drift)
+
+            # --------------------
+            # Title text (cute + shadow)
+            # --------------------
+            # Shadow
+            shadow_text = text_cache.render(title_font, title_str, (200, 180, 200))
+            title_background.blit(shadow_text, (WIDTH//2 - shadow_text.get_width()//2 + 3,
+                                                HEIGHT//3 + 3))
+
+            # Main color
+            title_text = text_cache.render(title_font, title_str, (255, 180, 220))
+            title_background.blit(title_text, (WIDTH//2 - title_text.get_width()//2, HEIGHT//3))
+
+            screen.blit(title_background, (0, 0))
+        else:
+            # Wipe last frame's button
+            screen.blit(title_background, button_area, button_area)
 
         # --------------------
         # Pulsing button with hover
@@ -485,38 +793,140 @@ def title_screen():
 
         pygame.draw.rect(screen, color, button_draw_rect, border_radius=15)
 
-        button_text = button_font.render("Let's Get Crazy", True, (80, 50, 70))
+        button_text = text_cache.render(button_font, "Let's Get Crazy", (80, 50, 70))
         screen.blit(button_text, (button_draw_rect.centerx - button_text.get_width() // 2,
                                   button_draw_rect.centery - button_text.get_height() // 2))
 
-        pygame.display.flip()
-
-# Show the title screen first
-title_screen()
-
-
-# --------------------
-# MAIN GAME LOOP
-# --------------------
-running = True
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(button_area)
+
+        # A guest can join while the host is still here
+        if net:
+            apply_net_events()
+
+
+# ==================================================
+# TWO PLAYERS
+# ==================================================
+# The other player shows up as a see-through ghost. Each side collects cats
+# on its own and tells the other which ones; only the host spawns new cats.
+GHOST_ALPHA = 120
+net_collected = []  # uids collected this tick, for the other player
+net_spawned = []    # (uid, x, y, sprite) spawned this tick
+remote_player = None  # (x, y, animation byte) while someone is connected
+remote_cat_count = 0
+
+def make_ghost(surface):
+    ghost = surface.copy()
+    ghost.fill((255, 255, 255, GHOST_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+    return ghost
+
+
+ghost_frames = None
+if net:
+    ghost_frames = {name: [make_ghost(f) for f in player_frames[name]] for name in ANIMATIONS}
+
+
+def animation_byte():
+    anim = next((i for i, name in enumerate(ANIMATIONS) if frames is player_frames[name]), 0)
+    return anim | (player_vel_x < 0) << 2 | current_frame << 3
+
+
+def apply_net_events():
+    global remote_player, remote_cat_count
+    for event in net.poll():
+        if event[0] == "joined":
+            net.welcome(world_seed, {key: getattr(args, key) for key in RECORDED_SETTINGS},
+                        [(cat.uid, cat.rect.x, cat.rect.y, cat.image) for cat in cat_pool])
+            print("net: a guest joined")
+        elif event[0] == "left":
+            remote_player = None
+            print("net: the other player left")
+        else:
+            _, x, y, anim, collected, spawned = event
+            remote_player = (x, y, anim)
+            remote_cat_count += len(collected)
+            for uid in collected:
+                cat = cat_pool.by_uid.get(uid)
+                if cat:
+                    remove_cat(cat)
+            for uid, x, y, image in spawned:
+                if uid not in cat_pool.by_uid:
+                    add_cat(pygame.Rect(x, y, cat_size, cat_size), image, uid)
+    net.flush()  # a welcome goes out straight away
+
+
+def send_net_tick():
+    net.send_tick(player_rect.x, player_rect.y, animation_byte(), net_collected, net_spawned,
+                  len(cat_pool))
+    net.flush()
+    net_collected.clear()
+    net_spawned.clear()
+
+
+def sync_welcome_cats(cats):
+    # Guest: the host may have collected or spawned cats before we joined
+    live = {uid: (x, y, image) for uid, x, y, image in cats}
+    for cat in cat_pool:
+        if live.get(cat.uid) != (cat.rect.x, cat.rect.y, cat.image):
+            remove_cat(cat)
+    for uid, (x, y, image) in live.items():
+        if uid not in cat_pool.by_uid:
+            add_cat(pygame.Rect(x, y, cat_size, cat_size), image, uid)
+
+
+if welcome:
+    sync_welcome_cats(welcome["cats"])
+
+
+def finish_net():
+    # Closes the connection and prints what it cost; returns the report
+    if net is None:
+        return None
+    net.close()
+    report = net.report()
+    print(f"net: {report['ticks']} ticks in {report['messages']} messages, "
+          f"{report['bytes_per_tick']:.1f} B/tick ({report['bytes_per_tick'] * 60 / 1024:.2f} KB/s), "
+          f"largest {report['peak_message_bytes']} B; sending the full state would be "
+          f"{report['full_state_bytes_per_tick']:.0f} B/tick")
+    if report["rtt_ms"]:
+        rtt = report["rtt_ms"]
+        print(f"net: round trip p50 {rtt['p50']:.2f} ms, p95 {rtt['p95']:.2f} ms, "
+              f"p99 {rtt['p99']:.2f} ms over {report['pings']} pings")
+    if report["tick_latency_ms"]:
+        latency = report["tick_latency_ms"]
+        print(f"net: tick latency p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+              f"p99 {latency['p99']:.2f} ms over {report['stamped_ticks']} stamped ticks")
+    return report
+
+
+# ==================================================
+# SIMULATION STEP
+# ==================================================
+# One tick of movement, collisions, collection, spawning and camera.
+# Shared by the windowed game and headless runs.
 frames = player_frames["idle"]  # ensure frames is initialized
 current_frame = 0
 frame_timer = 0
 
-while running:
-    clock.tick(60)
+def play_meow():
+    if audio:
+        audio.play("meow")
 
-    # --------------------
-    # EVENTS
-    # --------------------
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+
+def step_world(keys):
+    global player_vel_x, player_vel_y, on_ground, cat_count, spawn_timer
+    global camera_x, cloud_drift, frames, current_frame, frame_timer
+
+    # The other player's moves, collections and spawns since the last tick
+    if net:
+        apply_net_events()
 
     # --------------------
     # INPUT
     # --------------------
-    keys = pygame.key.get_pressed()
     player_vel_x = 0
     if keys[pygame.K_a] or keys[pygame.K_LEFT]:
         player_vel_x = -speed
@@ -525,19 +935,30 @@ while running:
     if (keys[pygame.K_w] or keys[pygame.K_SPACE]) and on_ground:
         player_vel_y = jump_strength
         on_ground = False
+    if profiler.enabled:
+        profiler.lap("input")
 
     # --------------------
     # MOVEMENT
     # --------------------
+    prev_player_x = player_rect.x
     player_rect.x += player_vel_x
     player_vel_y += gravity
     player_rect.y += player_vel_y
+    if profiler.enabled:
+        profiler.lap("movement")
 
     # --------------------
     # PLATFORM COLLISIONS
     # --------------------
     on_platform = False
     tolerance = 10
+    was_on_ground = on_ground
+    fall_speed = player_vel_y
+
+    # Broad phase: only platforms overlapping the player's swept x-range
+    sweep_left = min(prev_player_x, player_rect.x)
+    sweep_right = max(prev_player_x, player_rect.x) + player_rect.width
 
     if player_rect.colliderect(ground_rect):
         player_rect.bottom = ground_rect.top
@@ -545,7 +966,7 @@ while running:
         on_platform = True
         on_ground = True
 
-    for plat in platforms:
+    for plat in platform_index.query(sweep_left, sweep_right):
         if player_rect.colliderect(plat) and player_vel_y >= 0:
             if player_rect.bottom - player_vel_y <= plat.top + tolerance:
                 player_rect.bottom = plat.top
@@ -556,45 +977,63 @@ while running:
     if not on_platform:
         on_ground = False
 
+    # Dust puff on a proper landing
+    if on_ground and not was_on_ground and fall_speed >= LANDING_DUST_SPEED:
+        particles.emit(DUST, player_rect.centerx, player_rect.bottom,
+                       int(fall_speed), fall_speed / 12)
+
     # --------------------
     # WORLD BOUNDS
     # --------------------
-    player_rect.left = max(0, player_rect.left)
-    player_rect.right = min(WORLD_WIDTH, player_rect.right)
+    player_rect.left = max(world_left, player_rect.left)
+    player_rect.right = min(world_right, player_rect.right)
+    if profiler.enabled:
+        profiler.lap("platforms")
 
     # --------------------
     # CAT COLLECTION
     # --------------------
-    active_cats = [c for c in cats if not c["collected"]]
-    for cat in active_cats:
-        if player_rect.colliderect(cat["rect"]):
-            cat["collected"] = True
+    for cat in active_cat_index.query(player_rect.left, player_rect.right):
+        if player_rect.colliderect(cat.rect):
             cat_count += 1
-            random.choice(meow_sounds).play()
+            play_meow()
+            particles.emit(HEART, cat.rect.centerx, cat.rect.centery, HEART_BURST)
+            particles.emit(SPARKLE, cat.rect.centerx, cat.rect.centery, SPARKLE_BURST)
 
-    # REMOVE this cat's rect from blocking_rects
-        if cat["rect"] in blocking_rects:
-            blocking_rects.remove(cat["rect"])
+            # Free this cat's spot and slot for future spawns
+            if net:
+                net_collected.append(cat.uid)
+            remove_cat(cat)
+    if profiler.enabled:
+        profiler.lap("collection")
 
     # --------------------
     # DYNAMIC CAT SPAWNING
     # --------------------
+    # A guest gets its new cats from the host
     spawn_timer += 1
-    if spawn_timer >= spawn_interval:
+    if spawn_timer >= spawn_interval and (net is None or net.is_host):
         spawn_timer = 0
-        active_cats = [c for c in cats if not c["collected"]]
-        if len(active_cats) < MAX_CATS_ON_SCREEN:
-            cats_to_spawn = min(2, MAX_CATS_ON_SCREEN - len(active_cats))
-            for _ in range(cats_to_spawn):
-                plat = random.choice(platforms + [ground_rect])
-                spawn_cats_on_surface(plat, count=1)
+        active_count = len(cat_pool)
+        if active_count < MAX_CATS_ON_SCREEN:
+            spawn_cats(min(2, MAX_CATS_ON_SCREEN - active_count))
+    if profiler.enabled:
+        profiler.lap("spawning")
 
     # --------------------
     # CAMERA
     # --------------------
     camera_target = player_rect.centerx - WIDTH // 2
     camera_x += (camera_target - camera_x) * 0.1
-    camera_x = max(0, min(camera_x, WORLD_WIDTH - WIDTH))
+    camera_x = max(world_left, min(camera_x, world_right - WIDTH))
+
+    if ENDLESS:
+        stream_world()
+
+    # Clouds drift on their own
+    cloud_drift += CLOUD_DRIFT_SPEED
+    if profiler.enabled:
+        profiler.lap("camera")
 
     # --------------------
     # PLAYER ANIMATION
@@ -622,70 +1061,523 @@ while running:
     if frame_timer >= frame_speed:
         frame_timer = 0
         current_frame = (current_frame + 1) % len(frames)
+    if profiler.enabled:
+        profiler.lap("animation")
+
+    if net:
+        send_net_tick()
+
+
+# ==================================================
+# QUALITY TIERS
+# ==================================================
+# Each tier gives up a little more than the one before: swaying flowers,
+# clouds, the far hill layers, then resolution. The lowest tier draws the
+# world into a smaller canvas and scales it up to the window in one go.
+QUALITY_TIERS = [
+    {"name": "full", "flower_sway": True, "clouds": True, "hill_layers": 3, "scale": 1.0},
+    {"name": "still flowers", "flower_sway": False, "clouds": True, "hill_layers": 3, "scale": 1.0},
+    {"name": "no clouds", "flower_sway": False, "clouds": False, "hill_layers": 3, "scale": 1.0},
+    {"name": "near hills only", "flower_sway": False, "clouds": False, "hill_layers": 1,
+     "scale": 1.0},
+    {"name": "low resolution", "flower_sway": False, "clouds": False, "hill_layers": 1,
+     "scale": args.render_scale}
+]
+FRAME_BUDGET_MS = 1000 / 60
+
+# Scaled sprites and background layers per render scale, built on first use
+scaled_views = {1.0: (ScaledSprites(1.0), bg_hills, cloud_layer)}
+
+def apply_quality(tier):
+    global quality_tier, render_scale, canvas, view_sprites, view_hills, view_clouds
+    quality_tier = tier
+    render_scale = tier["scale"]
+    if render_scale not in scaled_views:
+        scaled_views[render_scale] = (ScaledSprites(render_scale),
+                                      [layer.scaled(render_scale) for layer in bg_hills],
+                                      cloud_layer.scaled(render_scale))
+    view_sprites, hills, clouds = scaled_views[render_scale]
+    view_hills = hills[len(hills) - tier["hill_layers"]:]
+    view_clouds = clouds if tier["clouds"] else None
+
+    canvas = screen
+    if render_scale != 1.0:
+        canvas = pygame.Surface((round(WIDTH * render_scale), round(HEIGHT * render_scale)))
+    terrain_cache.set_scale(render_scale)
+
+
+start_level = 0 if args.quality == "auto" else int(args.quality)
+governor = None
+if args.quality == "auto" and not HEADLESS:
+    governor = QualityGovernor(len(QUALITY_TIERS), FRAME_BUDGET_MS, level=start_level)
+apply_quality(QUALITY_TIERS[start_level])
+
+
+# ==================================================
+# DRAW EVERYTHING
+# ==================================================
+# Positions from the previous tick, so frames between ticks can be blended
+prev_player_pos = player_rect.topleft
+prev_camera_x = camera_x
+prev_cloud_drift = cloud_drift
+
+def remember_previous_state():
+    global prev_player_pos, prev_camera_x, prev_cloud_drift
+    prev_player_pos = player_rect.topleft
+    prev_camera_x = camera_x
+    prev_cloud_drift = cloud_drift
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def draw_world(alpha=1.0):
+    # alpha is how far we are between the previous tick and the current one
+    view_x = lerp(prev_camera_x, camera_x, alpha)
+    player_x = lerp(prev_player_pos[0], player_rect.x, alpha)
+    player_y = lerp(prev_player_pos[1], player_rect.y, alpha)
+    drift = lerp(prev_cloud_drift, cloud_drift, alpha)
+
+    cull_stats["drawn"] = 0
+    cull_stats["culled"] = 0
+
+    # The world goes to the canvas, which is the screen itself unless the
+    # quality tier renders at a lower resolution
+    scale = render_scale
+    sized = view_sprites.get
+    canvas.fill((180, 220, 255))  # sky
+
+    # Hills and clouds
+    draw_hills(canvas, view_x, view_hills)
+    if profiler.enabled:
+        profiler.lap("hills")
+    if view_clouds:
+        draw_clouds(canvas, view_x, drift, view_clouds)
+    if profiler.enabled:
+        profiler.lap("clouds")
+
+    # Ground, platforms and bushes (baked terrain chunks)
+    terrain_cache.draw(canvas, view_x)
+    if profiler.enabled:
+        profiler.lap("terrain")
 
-    flip = player_vel_x < 0
-    player_image = pygame.transform.flip(frames[current_frame], flip, False)
-
-
-
-    # ==================================================
-    # DRAW EVERYTHING
-    # ==================================================
-    screen.fill((180, 220, 255))  # sky
+    # Flowers
+    ticks = pygame.time.get_ticks()
+    sway = quality_tier["flower_sway"]
+    anchor_x = round(FLOWER_ANCHOR_X * scale)
+    anchor_y = round(FLOWER_ANCHOR_Y * scale)
+    for flower in visible(flower_index, view_x, FLOWER_DRAW_MARGIN):
+        phase = flower_phase(ticks, flower["angle"]) if sway else 0
+        frame = sized(flower_frames[flower["color"]][phase])
+        canvas.blit(frame, (int((flower["x"] - view_x) * scale) - anchor_x,
+                            int(flower["y"] * scale) - anchor_y))
+    if profiler.enabled:
+        profiler.lap("flowers")
 
-    # Hills
-    for layer in bg_hills:
-        screen.blit(layer["surface"], (-camera_x * layer["parallax"], 0))
+    # Cats
+    for cat in visible(active_cat_index, view_x):
+        canvas.blit(sized(cat_images[cat.image]),
+                    ((cat.rect.x - view_x) * scale, cat.rect.y * scale))
+    if profiler.enabled:
+        profiler.lap("cats")
 
-    # Clouds
-    for cloud in clouds:
-        cloud["x"] += cloud["speed"]
-        if cloud["x"] > WORLD_WIDTH:
-            cloud["x"] = -150
-        screen.blit(cloud["surface"], (cloud["x"] - camera_x * 0.3, cloud["y"]))
+    # Player
+    flip = player_vel_x < 0
+    player_image = pygame.transform.flip(sized(frames[current_frame]), flip, False)
+    canvas.blit(player_image, ((player_x - view_x) * scale, player_y * scale))
+
+    # The other player
+    if remote_player:
+        ghost_x, ghost_y, anim = remote_player
+        ghosts = ghost_frames[ANIMATIONS[min(anim & 3, 2)]] or ghost_frames["idle"]
+        if ghosts:
+            ghost_image = pygame.transform.flip(sized(ghosts[(anim >> 3) % len(ghosts)]),
+                                                bool(anim & 4), False)
+            canvas.blit(ghost_image, ((ghost_x - view_x) * scale, ghost_y * scale))
+    if profiler.enabled:
+        profiler.lap("player")
+
+    # Hearts, sparkles and dust
+    particles.draw(canvas, view_x, scale)
+    if profiler.enabled:
+        profiler.lap("particles")
+
+    if canvas is not screen:
+        pygame.transform.scale(canvas, (WIDTH, HEIGHT), screen)
+    if profiler.enabled:
+        profiler.lap("upscale")
+
+    # HUD (only re-rendered when the count changes), always at full resolution
+    screen.blit(basket_img, (20, 10))
+    count_text = text_cache.render(font, str(cat_count), TEXT_COLOR)
+    screen.blit(count_text, (20 + basket_img.get_width() + 8, 12))
+    if remote_player:
+        friend_text = text_cache.render(font, f"friend {remote_cat_count}", TEXT_COLOR)
+        screen.blit(friend_text, (20 + basket_img.get_width() + 8 + count_text.get_width() + 20, 12))
+
+    # Culling counter (F3)
+    if show_cull_stats:
+        stats_text = text_cache.render(
+            font, f"drawn {cull_stats['drawn']}  culled {cull_stats['culled']}  "
+                  f"particles {particles.count}  dropped {particles.dropped}", TEXT_COLOR)
+        screen.blit(stats_text, (WIDTH - stats_text.get_width() - 20, 12))
+
+    # Frame profiler (F4)
+    if show_profile:
+        draw_profile_overlay(screen)
+    if profiler.enabled:
+        profiler.lap("hud")
 
-    # Ground
-    pygame.draw.rect(screen, GROUND_COLOR,
-                     pygame.Rect(ground_rect.x - camera_x, ground_rect.y,
-                                 ground_rect.width, ground_rect.height),
-                     border_radius=20)
+    pygame.display.flip()
+    if profiler.enabled:
+        profiler.lap("flip")
+
+
+# ==================================================
+# RECORD / REPLAY
+# ==================================================
+recorder = None
+if args.record:
+    recorder = InputRecorder(world_seed, {key: getattr(args, key) for key in RECORDED_SETTINGS})
+replay_input = ReplayInput(replay) if replay else None
+
+def final_state():
+    return (player_rect.x, player_rect.y, cat_count)
+
+
+def finish_recording(ticks_run):
+    # Saves the recording and checks a replay; False if the replay didn't match
+    if recorder:
+        recorder.save(args.record, final_state())
+        print(f"record: {recorder.ticks} ticks in {len(recorder.runs)} runs "
+              f"written to {args.record}")
+    if replay is None:
+        return True
+    if ticks_run < replay["ticks"]:
+        print(f"replay: stopped at tick {ticks_run} of {replay['ticks']}")
+        return False
+    if final_state() != replay["final"]:
+        print(f"replay: final state {final_state()} differs from the recorded {replay['final']}")
+        return False
+    print(f"replay: final state {final_state()} matches the recording")
+    return True
 
-    # Platforms
-    for plat in platforms:
-        pygame.draw.rect(screen, (200, 180, 240),
-                         pygame.Rect(plat.x - camera_x, plat.y, plat.width, plat.height),
-                         border_radius=5)
 
-    # Flowers
-    for flower in flowers:
-        sway = math.sin(pygame.time.get_ticks() / 400 + flower["angle"]) * 4
-        fx = flower["x"] + sway - camera_x
-        fy = flower["y"]
-        pygame.draw.line(screen, (90, 150, 90), (int(fx), int(fy)), (int(fx), int(fy - 18)), 2)
-        for angle in range(0, 360, 60):
-            rad = math.radians(angle)
-            pygame.draw.circle(screen, flower["color"],
-                               (int(fx + math.cos(rad) * 5), int(fy - 18 + math.sin(rad) * 5)), 4)
-        pygame.draw.circle(screen, (255, 230, 120), (int(fx), fy - 18), 3)
+# ==================================================
+# SNAPSHOTS
+# ==================================================
+# F5 saves the whole simulation state and F9 puts it back. Particles are only
+# for show, so they are cleared rather than saved.
+QUICKSAVE_PATH = os.path.join(CACHE_DIR, "quicksave.ccs")
+
+def take_snapshot(tick):
+    snap = {key: getattr(args, key) for key in RECORDED_SETTINGS}
+    snap.update(
+        seed=world_seed, tick=tick, x=player_rect.x, y=player_rect.y,
+        vel_x=player_vel_x, vel_y=player_vel_y, on_ground=on_ground,
+        animation=next((i for i, name in enumerate(ANIMATIONS)
+                        if frames is player_frames[name]), 0),
+        frame=current_frame, frame_timer=frame_timer, camera_x=camera_x,
+        cloud_drift=cloud_drift, cat_count=cat_count, spawn_timer=spawn_timer,
+        next_uid=cat_pool.next_uid, random=spawn_rng.getstate(),
+        cats=[(cat.slot, cat.uid, cat.rect.x, cat.rect.y, cat.image) for cat in cat_pool],
+        free=list(cat_pool.free), world=None
+    )
+    if ENDLESS:
+        snap["world"] = {
+            "left": world_left,
+            "right": world_right,
+            "chunks": [chunk["layout"] for chunk in world_chunks],
+            "generator": chunk_generator.state()
+        }
+    return snap
+
+
+def restore_snapshot(snap):
+    # Returns the snapshot's tick
+    global player_vel_x, player_vel_y, on_ground, cat_count, spawn_timer
+    global camera_x, cloud_drift, frames, current_frame, frame_timer
+    global world_left, world_right
+    if snap["seed"] != world_seed or any(snap[key] != getattr(args, key)
+                                         for key in RECORDED_SETTINGS):
+        raise ValueError("snapshot is from a different world")
+
+    # Cats never move, so a live cat that matches a saved one stays indexed
+    saved_cats = {uid: (slot, x, y, image) for slot, uid, x, y, image in snap["cats"]}
+    for cat in cat_pool:
+        if saved_cats.get(cat.uid) != (cat.slot, cat.rect.x, cat.rect.y, cat.image):
+            remove_cat(cat)
+    kept = {cat.uid: cat.rect for cat in cat_pool}
+
+    if ENDLESS:
+        # A chunk index always has the same layout for a seed, so only the
+        # chunks that differ are swapped
+        world = snap["world"]
+        saved_chunks = {layout["index"]: layout for layout in world["chunks"]}
+        live = {}
+        for chunk in world_chunks:
+            if chunk["index"] in saved_chunks:
+                live[chunk["index"]] = chunk
+            else:
+                remove_layout(chunk)
+        world_chunks.clear()
+        for index, layout in saved_chunks.items():
+            chunk = live.get(index)
+            if chunk is None:
+                # Live cats come from the pool below, not the starting cats
+                chunk = add_layout(dict(layout, cats=()))
+                chunk["index"] = index
+                chunk["x1"] = layout["x1"]
+            world_chunks.append(chunk)
+        platforms[:] = [p for chunk in world_chunks for p in chunk["platforms"]]
+        flowers[:] = [f for chunk in world_chunks for f in chunk["flowers"]]
+        bushes[:] = [b for chunk in world_chunks for b in chunk["bushes"]]
+
+        generator = world["generator"]
+        if (chunk_generator.next_index != generator["next_index"]
+                or chunk_generator.chunk_rects.keys() != generator["chunk_rects"].keys()):
+            chunk_generator.restore(generator)
+        if (world_left, world_right) != (world["left"], world["right"]):
+            world_left, world_right = world["left"], world["right"]
+            ground_rect.x = world_left
+            ground_rect.width = world_right - world_left
+            spawn_slots.resize_surface(ground_rect)
+            terrain_cache.invalidate()
+
+    cats = cat_pool.restore([(slot, uid, kept[uid] if uid in kept
+                              else pygame.Rect(x, y, cat_size, cat_size), image)
+                             for slot, uid, x, y, image in snap["cats"]],
+                            snap["free"], snap["next_uid"])
+    for cat in cats:
+        if cat.uid not in kept:
+            active_cat_index.insert(cat.rect, cat)
+            register_rect(cat.rect)
+
+    player_rect.topleft = (snap["x"], snap["y"])
+    player_vel_x, player_vel_y = snap["vel_x"], snap["vel_y"]
+    on_ground = snap["on_ground"]
+    frames = player_frames[ANIMATIONS[snap["animation"]]] or frames
+    current_frame, frame_timer = snap["frame"], snap["frame_timer"]
+    camera_x, cloud_drift = snap["camera_x"], snap["cloud_drift"]
+    cat_count, spawn_timer = snap["cat_count"], snap["spawn_timer"]
+    spawn_rng.setstate(snap["random"])
+    particles.clear()
+    remember_previous_state()
+    return snap["tick"]
+
+
+def quicksave(tick):
+    start = time.perf_counter()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        save_snapshot(QUICKSAVE_PATH, take_snapshot(tick))
+    except OSError as e:
+        print(f"snapshot: can't save {QUICKSAVE_PATH}: {e}")
+        return
+    print(f"snapshot: saved tick {tick} in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+def quickload():
+    # Returns the tick to carry on from, or None if nothing was loaded
+    if recorder or replay or net:
+        # A load would only rewind this side of a two-player game
+        print("snapshot: quickload is off while recording, replaying or playing together")
+        return None
+    start = time.perf_counter()
+    try:
+        tick = restore_snapshot(load_snapshot(QUICKSAVE_PATH))
+    except (OSError, ValueError) as e:
+        print(f"snapshot: can't load {QUICKSAVE_PATH}: {e}")
+        return None
+    print(f"snapshot: loaded tick {tick} in {(time.perf_counter() - start) * 1000:.2f} ms")
+    return tick
+
+
+start_tick = restore_snapshot(start_snapshot) if start_snapshot else 0
+
+
+# ==================================================
+# HEADLESS RUN
+# ==================================================
+# Steps the world as fast as the CPU allows from scripted or replayed input.
+# Drawing is off unless asked for; each tick is one profiler "frame".
+# Two-player runs go at 60 ticks per second so both sides stay in step.
+def run_headless(ticks, source, render=False, start_tick=0):
+    sim_times = []
+    render_times = []
+    now = time.perf_counter
+    start = now()
+    for tick in range(start_tick, start_tick + ticks):
+        tick_start = now()
+        if profiler.enabled:
+            profiler.begin_frame()
+        keys = source.keys_for(tick)
+        if recorder:
+            recorder.record(keys)
+        if profiler.enabled:
+            profiler.lap("events")
+        step_world(keys)
+        sim_end = now()
+        sim_times.append(sim_end - tick_start)
+
+        if render:
+            particles.update()
+            if profiler.enabled:
+                profiler.lap("particle update")
+            draw_world()
+            render_times.append(now() - sim_end)
+        if profiler.enabled:
+            profiler.end_frame()
+        if net:
+            time.sleep(max(0.0, start + (tick - start_tick + 1) / 60 - now()))
+    elapsed = now() - start
+
+    rate = ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"headless: {ticks} ticks ({ticks / 60 / 60:.1f} simulated minutes) "
+          f"in {elapsed:.2f}s, {rate:.0f} ticks/s")
+    print(f"headless: player at {player_rect.topleft}, cats collected {cat_count}")
+    if ENDLESS:
+        print(f"headless: live world {world_left}-{world_right}, {len(world_chunks)} chunks, "
+              f"{len(platforms)} platforms, {len(cat_pool)} cats, {len(blocking_index)} blocking rects")
+    return sim_times, render_times
+
+
+def write_report(path, sim_times, render_times, net_report=None):
+    report = {
+        "seed": world_seed,
+        "endless": ENDLESS,
+        "ticks": len(sim_times),
+        "startup_ms": startup_ms,
+        "generation_ms": generation_ms,
+        "sim_ms": summarize(sim_times),
+        "render_ms": summarize(render_times) if render_times else None,
+        "world": {
+            "width": world_right - world_left,
+            "platforms": len(platforms),
+            "flowers": len(flowers),
+            "bushes": len(bushes),
+            "cats_active": len(cat_pool),
+            "cats_collected": cat_count
+        },
+        "net": net_report
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def dump_profile():
+    if args.profile:
+        profiler.dump(args.profile)
+        print(f"profile: {profiler.frames} frames written to {args.profile}")
+
+
+if HEADLESS:
+    source = replay_input or ScriptedInput(args.input)
+    if net and net.is_host:
+        print("net: waiting for a guest")
+        if not net.wait_for_guest(args.net_timeout):
+            print(f"net: no guest joined within {args.net_timeout:g} s")
+            net.close()
+            pygame.quit()
+            sys.exit(1)
+    sim_times, render_times = run_headless(args.ticks, source, args.render, start_tick)
+    net_report = finish_net()
+    if args.report:
+        write_report(args.report, sim_times, render_times, net_report)
+    if args.save_snapshot:
+        save_snapshot(args.save_snapshot, take_snapshot(start_tick + args.ticks))
+    dump_profile()
+    replay_ok = finish_recording(args.ticks)
+    pygame.quit()
+    sys.exit(0 if replay_ok else 1)
+
+# Show the title screen first (replays start straight away)
+if replay is None:
+    title_screen()
 
-    # Bushes
-    for bush in bushes:
-        draw_bush(screen, bush, camera_x)
 
-    # Cats
-    for cat in cats:
-        if not cat["collected"]:
-            screen.blit(cat["image"], (cat["rect"].x - camera_x, cat["rect"].y))
+# --------------------
+# MAIN GAME LOOP
+# --------------------
+# The world always advances in fixed 60 Hz ticks; rendering runs as fast as
+# --max-fps allows and blends between the last two ticks
+TICK_MS = 1000 / 60
+MAX_CATCHUP_TICKS = 5  # beyond this the game slows down instead of spiralling
 
-    # Player
-    screen.blit(player_image, (player_rect.x - camera_x, player_rect.y))
+running = True
+accumulator = 0.0
+tick = start_tick
+tick_limit = replay["ticks"] if replay else math.inf
+clock.tick()
 
-    # HUD
-    screen.blit(basket_img, (20, 10))
-    count_text = font.render(str(cat_count), True, TEXT_COLOR)
-    screen.blit(count_text, (20 + basket_img.get_width() + 8, 12))
+while running:
+    frame_ms = clock.tick(args.max_fps)
+    accumulator += frame_ms
+    if profiler.enabled:
+        profiler.begin_frame()
 
-    pygame.display.flip()
+    # --------------------
+    # EVENTS
+    # --------------------
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            show_cull_stats = not show_cull_stats
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            toggle_profile_overlay()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+            quicksave(tick)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+            loaded_tick = quickload()
+            if loaded_tick is not None:
+                tick = loaded_tick
+
+    audio.new_frame()
 
+    keys = pygame.key.get_pressed()
+    if profiler.enabled:
+        profiler.lap("events")
+    ticks_run = 0
+    while accumulator >= TICK_MS and ticks_run < MAX_CATCHUP_TICKS and tick < tick_limit:
+        tick_keys = replay_input.keys_for(tick) if replay_input else keys
+        if recorder:
+            recorder.record(tick_keys)
+        remember_previous_state()
+        step_world(tick_keys)
+        accumulator -= TICK_MS
+        ticks_run += 1
+        tick += 1
+
+    # Too far behind: drop the backlog rather than chase it
+    if accumulator >= TICK_MS:
+        accumulator %= TICK_MS
+
+    # Particles are only for show, so they move per frame rather than per tick
+    particles.update(min(frame_ms / TICK_MS, MAX_CATCHUP_TICKS))
+    if profiler.enabled:
+        profiler.lap("particle update")
+
+    draw_world(accumulator / TICK_MS)
+    if profiler.enabled:
+        profiler.end_frame()
+
+    # Frame work time, without the wait for --max-fps
+    if governor and governor.add(clock.get_rawtime()):
+        apply_quality(QUALITY_TIERS[governor.level])
+        print(f"quality: {quality_tier['name']}")
+
+    if tick >= tick_limit:
+        running = False
+
+if args.save_snapshot:
+    save_snapshot(args.save_snapshot, take_snapshot(tick))
+finish_net()
+if audio:
+    print("audio: {played} played, {stolen} stolen, {dropped} dropped, "
+          "{limited} over the per-frame limit".format(**audio.stats))
+dump_profile()
+finish_recording(tick)
 pygame.quit()
 sys.exit()
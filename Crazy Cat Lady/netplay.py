@@ -0,0 +1,424 @@
+# --------------------
+# Networked co-op
+# --------------------
+# Two players in one world. Both sides build the level from the same seed,
+# so only what changes goes over the wire: each tick's player movement and
+# animation, the cats that player collected and, from the host (the only
+# side that spawns), new cats. A tick where nothing changed sends nothing.
+# The socket work runs on an asyncio loop in a background thread; the game
+# thread queues its ticks, flushes them once per frame and drains what
+# arrived with poll().
+#
+# Every message is a u16 length, then a u8 type (little endian):
+#   HELLO    guest -> host: magic "CCLN", version
+#   WELCOME  host -> guest: magic, version, seed and world settings, then
+#            the live cats as (uid, x, y, sprite)
+#   TICK     flags, then only the parts the flags name:
+#              position   dx, dy as int8, or x, y as int32 for big moves
+#              animation  animation | facing left << 2 | frame << 3
+#              collected  count, uid per cat
+#              spawned    count, (uid, x, y, sprite) per cat
+#              stamp      the sender's clock, on about one tick per
+#                         PING_INTERVAL, for tick latency
+#   PING     the sender's clock; PONG echoes it back, with the replier's
+#            clock, for round-trip times and the offset between the clocks
+#   BYE
+
+import asyncio
+from array import array
+import queue
+import struct
+import threading
+import time
+
+from profiler import summarize
+
+NET_MAGIC = b"CCLN"
+NET_VERSION = 2
+DEFAULT_PORT = 4747
+PING_INTERVAL = 0.25  # seconds, also how often a tick is stamped
+
+LENGTH = struct.Struct("<H")
+HELLO, WELCOME, TICK, PING, PONG, BYE = range(6)
+
+HELLO_RECORD = struct.Struct("<B4sH")
+# type, magic, version, seed, endless, world width, max cats, platform
+# density, decor density, spawn window (-1 for none), live cats
+WELCOME_HEADER = struct.Struct("<B4sHqBIIddiH")
+CAT_RECORD = struct.Struct("<IihB")  # uid, x, y, sprite
+TICK_HEADER = struct.Struct("<BB")   # type, flags
+POS_DELTA = struct.Struct("<bb")
+POS_ABS = struct.Struct("<ii")
+COUNT = struct.Struct("<B")
+UID = struct.Struct("<I")
+PING_RECORD = struct.Struct("<Bd")
+PONG_RECORD = struct.Struct("<Bdd")  # type, echoed clock, replier's clock
+STAMP = struct.Struct("<d")
+
+# TICK flags
+MOVED = 1
+JUMPED = 2  # absolute position
+ANIMATED = 4
+COLLECTED = 8
+SPAWNED = 16
+STAMPED = 32
+
+# What the naive protocol would send every tick, for the report: absolute
+# position and animation, then every live cat
+FULL_STATE_BYTES = LENGTH.size + TICK_HEADER.size + POS_ABS.size + 1 + COUNT.size
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    # "host:port", "host" or ":port"
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+def _frame(body):
+    return LENGTH.pack(len(body)) + body
+
+
+def encode_welcome(seed, settings, cats):
+    window = settings["spawn_window"]
+    return _frame(WELCOME_HEADER.pack(WELCOME, NET_MAGIC, NET_VERSION, seed,
+                                      settings["endless"], settings["world_width"],
+                                      settings["max_cats"], settings["platform_density"],
+                                      settings["decor_density"],
+                                      -1 if window is None else window, len(cats))
+                  + b"".join(CAT_RECORD.pack(*cat) for cat in cats))
+
+
+def decode_welcome(body):
+    (_, magic, version, seed, endless, world_width, max_cats, platform_density,
+     decor_density, window, cat_total) = WELCOME_HEADER.unpack_from(body)
+    if magic != NET_MAGIC or version != NET_VERSION:
+        raise ValueError(f"host speaks version {version}, expected {NET_VERSION}")
+    return {
+        "seed": seed,
+        "settings": {"endless": bool(endless), "world_width": world_width,
+                     "max_cats": max_cats, "platform_density": platform_density,
+                     "decor_density": decor_density,
+                     "spawn_window": None if window < 0 else window},
+        "cats": list(CAT_RECORD.iter_unpack(body[WELCOME_HEADER.size:
+                                                 WELCOME_HEADER.size
+                                                 + CAT_RECORD.size * cat_total]))
+    }
+
+
+class TickEncoder:
+    # Turns this side's per-tick state into TICK messages, relative to
+    # whatever was sent last
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.x = self.y = self.anim = None
+
+    def encode(self, x, y, anim, collected, spawned, stamp=None):
+        # Returns the framed message, or b"" when nothing changed. A stamp
+        # never makes a message on its own.
+        flags = 0
+        parts = []
+        if (x, y) != (self.x, self.y):
+            if self.x is not None and -128 <= x - self.x < 128 and -128 <= y - self.y < 128:
+                flags |= MOVED
+                parts.append(POS_DELTA.pack(x - self.x, y - self.y))
+            else:
+                flags |= JUMPED
+                parts.append(POS_ABS.pack(x, y))
+            self.x, self.y = x, y
+        if anim != self.anim:
+            flags |= ANIMATED
+            parts.append(COUNT.pack(anim))
+            self.anim = anim
+        # At most 255 of each per message; more would mean a broken world
+        if collected:
+            flags |= COLLECTED
+            parts.append(COUNT.pack(len(collected)))
+            parts.append(array("I", collected).tobytes())
+        if spawned:
+            flags |= SPAWNED
+            parts.append(COUNT.pack(len(spawned)))
+            parts.extend(CAT_RECORD.pack(*cat) for cat in spawned)
+        if not flags:
+            return b""
+        if stamp is not None:
+            flags |= STAMPED
+            parts.append(STAMP.pack(stamp))
+        return _frame(TICK_HEADER.pack(TICK, flags) + b"".join(parts))
+
+
+class TickDecoder:
+    # The other side's player, rebuilt from its TICK messages
+    def __init__(self):
+        self.x = self.y = 0
+        self.anim = 0
+
+    def decode(self, body):
+        # Returns (collected uids, spawned cats, stamp or None)
+        _, flags = TICK_HEADER.unpack_from(body)
+        offset = TICK_HEADER.size
+        if flags & MOVED:
+            dx, dy = POS_DELTA.unpack_from(body, offset)
+            self.x += dx
+            self.y += dy
+            offset += POS_DELTA.size
+        if flags & JUMPED:
+            self.x, self.y = POS_ABS.unpack_from(body, offset)
+            offset += POS_ABS.size
+        if flags & ANIMATED:
+            self.anim = body[offset]
+            offset += 1
+        collected = []
+        if flags & COLLECTED:
+            n = body[offset]
+            collected = array("I", body[offset + 1:offset + 1 + UID.size * n]).tolist()
+            offset += 1 + UID.size * n
+        spawned = []
+        if flags & SPAWNED:
+            n = body[offset]
+            spawned = list(CAT_RECORD.iter_unpack(
+                body[offset + 1:offset + 1 + CAT_RECORD.size * n]))
+            offset += 1 + CAT_RECORD.size * n
+        stamp = None
+        if flags & STAMPED:
+            (stamp,) = STAMP.unpack_from(body, offset)
+        return collected, spawned, stamp
+
+
+class NetSession:
+    # Build with NetSession.host() or NetSession.join(). Everything except the
+    # underscored coroutines runs on the game thread.
+    def __init__(self, is_host):
+        self.is_host = is_host
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.inbox = queue.SimpleQueue()
+        self.peer_joined = threading.Event()
+        self.server = None
+        self.address = None
+        self.connected = False  # peer present and greeted, as the game thread sees it
+        self.outgoing = bytearray()
+        self.encoder = TickEncoder()
+
+        # Asyncio thread only
+        self.writer = None
+        self.tasks = []
+
+        # Stats
+        self.ticks = 0
+        self.messages = 0
+        self.bytes_sent = 0
+        self.peak_message = 0
+        self.full_state_bytes = 0
+        self.bytes_received = 0
+        self.rtts = array("d")
+        self.last_stamp = 0.0
+        # The peer's clock minus ours, from the ping with the shortest round
+        # trip so far (written by the asyncio thread)
+        self.clock_offset = None
+        self.best_rtt = float("inf")
+        self.latencies = array("d")  # stamped tick age when the game gets it
+
+    def _run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    @classmethod
+    def host(cls, host, port):
+        session = cls(True)
+        session.server = session._run(asyncio.start_server(session._serve, host, port))
+        session.address = session.server.sockets[0].getsockname()[:2]
+        return session
+
+    @classmethod
+    def join(cls, host, port, timeout=30.0):
+        # Returns (session, welcome); the guest is connected straight away
+        session = cls(False)
+        try:
+            welcome = session._run(asyncio.wait_for(session._connect(host, port), timeout))
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"no welcome from {host}:{port}") from None
+        session.address = (host, port)
+        session.connected = True
+        return session, welcome
+
+    # --------------------
+    # Asyncio side
+    # --------------------
+    async def _read_message(self, reader):
+        (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+        body = await reader.readexactly(length)
+        self.bytes_received += LENGTH.size + length
+        return body
+
+    async def _connect(self, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(_frame(HELLO_RECORD.pack(HELLO, NET_MAGIC, NET_VERSION)))
+        # The host pings as soon as we say hello, but only welcomes us once
+        # its game loop gets round to it
+        body = await self._read_message(reader)
+        while body[0] == PING:
+            writer.write(self._pong(body))
+            body = await self._read_message(reader)
+        if body[0] != WELCOME:
+            writer.close()
+            raise ConnectionError("the host did not welcome us")
+        welcome = decode_welcome(body)
+        self._start_peer(reader, writer)
+        return welcome
+
+    async def _serve(self, reader, writer):
+        # One guest at a time; anyone else is turned away
+        if self.writer is not None:
+            writer.close()
+            return
+        try:
+            body = await asyncio.wait_for(self._read_message(reader), 5.0)
+            _, magic, version = HELLO_RECORD.unpack(body)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, struct.error):
+            writer.close()
+            return
+        if magic != NET_MAGIC or version != NET_VERSION:
+            writer.close()
+            return
+        self._start_peer(reader, writer)
+        self.inbox.put(("joined",))
+        self.peer_joined.set()
+
+    def _pong(self, ping):
+        _, sent = PING_RECORD.unpack(ping)
+        return _frame(PONG_RECORD.pack(PONG, sent, time.perf_counter()))
+
+    def _start_peer(self, reader, writer):
+        self.writer = writer
+        self.tasks = [self.loop.create_task(self._read_loop(reader, writer)),
+                      self.loop.create_task(self._ping_loop(writer))]
+
+    async def _read_loop(self, reader, writer):
+        decoder = TickDecoder()
+        try:
+            while True:
+                body = await self._read_message(reader)
+                kind = body[0]
+                if kind == TICK:
+                    collected, spawned, stamp = decoder.decode(body)
+                    self.inbox.put(("tick", decoder.x, decoder.y, decoder.anim,
+                                    collected, spawned, stamp))
+                elif kind == PING:
+                    writer.write(self._pong(body))
+                elif kind == PONG:
+                    _, sent, replied = PONG_RECORD.unpack(body)
+                    now = time.perf_counter()
+                    rtt = now - sent
+                    self.rtts.append(rtt)
+                    if rtt < self.best_rtt:
+                        # Assume the reply was stamped halfway through
+                        self.best_rtt = rtt
+                        self.clock_offset = replied - (sent + now) / 2
+                elif kind == BYE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        self.tasks[1].cancel()
+        self.writer = None
+        writer.close()
+        self.inbox.put(("left",))
+
+    async def _ping_loop(self, writer):
+        while True:
+            writer.write(_frame(PING_RECORD.pack(PING, time.perf_counter())))
+            await asyncio.sleep(PING_INTERVAL)
+
+    def _write(self, data):
+        if self.writer is not None:
+            self.writer.write(data)
+
+    # --------------------
+    # Game side
+    # --------------------
+    def wait_for_guest(self, timeout=None):
+        return self.peer_joined.wait(timeout)
+
+    def poll(self):
+        # Everything that arrived since the last call, oldest first:
+        # ("joined",), ("left",) or ("tick", x, y, anim, collected, spawned)
+        events = []
+        while True:
+            try:
+                event = self.inbox.get_nowait()
+            except queue.Empty:
+                return events
+            if event[0] == "left":
+                self.connected = False
+            elif event[0] == "tick":
+                # From the other side's send_tick() to now, in our clock
+                stamp = event[-1]
+                offset = self.clock_offset
+                if stamp is not None and offset is not None:
+                    self.latencies.append(time.perf_counter() - (stamp - offset))
+                event = event[:-1]
+            events.append(event)
+
+    def welcome(self, seed, settings, cats):
+        # Host: greet a guest that just joined with the world and its cats
+        self.outgoing += encode_welcome(seed, settings, cats)
+        self.encoder.reset()
+        self.connected = True
+
+    def send_tick(self, x, y, anim, collected, spawned, live_cats):
+        if not self.connected:
+            return
+        now = time.perf_counter()
+        stamp = now if now - self.last_stamp >= PING_INTERVAL else None
+        message = self.encoder.encode(x, y, anim, collected, spawned, stamp)
+        if message and stamp is not None:
+            self.last_stamp = now
+        self.ticks += 1
+        self.full_state_bytes += FULL_STATE_BYTES + CAT_RECORD.size * live_cats
+        if message:
+            self.outgoing += message
+            self.messages += 1
+            self.bytes_sent += len(message)
+            self.peak_message = max(self.peak_message, len(message))
+
+    def flush(self):
+        if self.outgoing:
+            self.loop.call_soon_threadsafe(self._write, bytes(self.outgoing))
+            self.outgoing.clear()
+
+    def close(self):
+        if self.connected:
+            self.outgoing += _frame(bytes([BYE]))
+            self.flush()
+        self._run(self._shutdown(), 2.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(2.0)
+
+    async def _shutdown(self):
+        if self.writer is not None:
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            self.writer.close()
+        for task in self.tasks:
+            task.cancel()
+        if self.server is not None:
+            self.server.close()
+
+    def report(self):
+        ticks = max(1, self.ticks)
+        return {
+            "ticks": self.ticks,
+            "messages": self.messages,
+            "bytes_sent": self.bytes_sent,
+            "bytes_per_tick": self.bytes_sent / ticks,
+            "peak_message_bytes": self.peak_message,
+            "full_state_bytes_per_tick": self.full_state_bytes / ticks,
+            "bytes_received": self.bytes_received,
+            "pings": len(self.rtts),
+            "rtt_ms": summarize(self.rtts) if self.rtts else None,
+            "stamped_ticks": len(self.latencies),
+            "tick_latency_ms": summarize(self.latencies) if self.latencies else None
+        }
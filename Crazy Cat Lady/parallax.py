@@ -0,0 +1,179 @@
+# --------------------
+# Parallax background layers
+# --------------------
+# Each layer is a short strip that wraps seamlessly, so its memory depends on
+# the window size rather than WORLD_WIDTH. Drawing only blits the part of
+# the strip that is currently on screen.
+
+import numpy as np
+import pygame
+
+
+class ParallaxLayer:
+    def __init__(self, surface, y, parallax, scale=1.0):
+        self.surface = surface
+        self.y = y
+        self.parallax = parallax
+        self.scale = scale
+
+    def scaled(self, scale):
+        # Copy for a render target `scale` times the window size. The scale is
+        # folded into parallax, so callers keep passing world scroll positions.
+        w, h = self.surface.get_size()
+        surface = pygame.transform.smoothscale(self.surface, (round(w * scale), round(h * scale)))
+        return ParallaxLayer(surface, round(self.y * scale), self.parallax * scale,
+                             self.scale * scale)
+
+    def draw(self, screen, scroll_x):
+        strip_w = self.surface.get_width()
+        strip_h = self.surface.get_height()
+        screen_w = screen.get_width()
+
+        offset = int(scroll_x) % strip_w
+        x = 0
+        while x < screen_w:
+            span = min(strip_w - offset, screen_w - x)
+            screen.blit(self.surface, (x, self.y), (offset, 0, span, strip_h))
+            x += span
+            offset = 0
+
+
+def _wrapped(strip_w, x, w):
+    # Positions to draw a shape at so it also shows up across the seam
+    return [x + shift for shift in (-strip_w, 0, strip_w)
+            if x + shift < strip_w and x + shift + w > 0]
+
+
+# --------------------
+# Hills
+# --------------------
+# A layer is one colour, and every hill reaches down into the solid base, so
+# the silhouette is just a height per column: the highest point of any
+# ellipse over that column. NumPy works that out for every ellipse and column
+# at once and writes the pixels straight into the surface's buffer.
+HILL_WOBBLE_Y = 20
+
+def hill_ellipses(rng, strip_w, base_y, index, min_h, max_h, spacing):
+    # (x, y, w, h) of every hill, including copies across the seam
+    ellipses = []
+    x = 0
+    while x < strip_w:
+        base_width = rng.randint(260, 420)
+        base_height = rng.randint(min_h, max_h)
+
+        # Main hill
+        for wx in _wrapped(strip_w, x, base_width):
+            ellipses.append((wx, base_y, base_width, base_height))
+
+        # Add small wobble only for mid/near hills
+        if index != 0:
+            for _ in range(rng.randint(1, 2)):
+                wobble_w = base_width + rng.randint(-60, 60)
+                wobble_h = base_height + rng.randint(-30, 30)
+                wobble_x = x + rng.randint(-40, 40)
+                wobble_y = base_y + rng.randint(-HILL_WOBBLE_Y, HILL_WOBBLE_Y)
+                for wx in _wrapped(strip_w, wobble_x, wobble_w):
+                    ellipses.append((wx, wobble_y, wobble_w, wobble_h))
+
+        x += spacing + rng.randint(-60, 60)
+
+    return ellipses
+
+
+def hill_profile(ellipses, strip_w, base_top):
+    # First filled row of every column, sampling at pixel centres
+    tops = np.full(strip_w, base_top, np.int64)
+    shapes = np.array([e for e in ellipses if e[2] > 0 and e[3] > 0], np.int64).reshape(-1, 4)
+    x, y, w, h = shapes.T
+    lo = np.clip(x, 0, strip_w)
+    counts = np.maximum(np.clip(x + w, 0, strip_w) - lo, 0)
+
+    # One entry per (ellipse, column it covers), all ellipses in one go
+    which = np.repeat(np.arange(len(shapes)), counts)
+    columns = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - lo, counts)
+    rx = w[which] / 2
+    ry = h[which] / 2
+    dx = (columns + 0.5 - x[which] - rx) / rx
+    edge = np.ceil(y[which] + ry - ry * np.sqrt(np.maximum(1 - dx * dx, 0)) - 0.5)
+    edge[np.abs(dx) >= 1] = base_top  # no pixel centre inside on this column
+
+    np.minimum.at(tops, columns, edge.astype(np.int64))
+    return tops
+
+
+def build_hill_layer(rng, strip_w, screen_h, index, color, y_offset,
+                     min_h, max_h, spacing, parallax):
+    top = screen_h - y_offset - HILL_WOBBLE_Y
+    height = screen_h - top
+    ellipses = hill_ellipses(rng, strip_w, screen_h - y_offset - top, index,
+                             min_h, max_h, spacing)
+
+    # Solid base to prevent sky gaps between hills
+    base_top = screen_h - y_offset + min_h // 2 - top
+    tops = hill_profile(ellipses, strip_w, base_top)
+
+    # Rows above the highest hill are empty and rows below the base solid, so
+    # only the band in between needs a per-pixel test. Pixels are built in
+    # the display's BGRA order; anything else makes every blit convert.
+    band_top = max(0, min(int(tops.min()), base_top))
+    clear = np.uint32(color[2] | color[1] << 8 | color[0] << 16)
+    solid = clear | np.uint32(0xFF000000)
+    pixels = np.empty((height, strip_w), np.uint32)
+    pixels[:band_top] = clear
+    pixels[base_top:] = solid
+    rows = np.arange(band_top, base_top, dtype=np.int32)[:, None]
+    pixels[band_top:base_top] = np.where(rows >= tops[None, :], solid, clear)
+
+    # The surface keeps the array alive and shares its memory
+    surface = pygame.image.frombuffer(pixels, (strip_w, height), "BGRA")
+    return ParallaxLayer(surface, top, parallax)
+
+
+# --------------------
+# Clouds
+# --------------------
+CLOUD_SPACING = 250
+CLOUD_STRIP_HEIGHT = 180
+
+def build_cloud_layer(rng, strip_w, color, alpha, parallax):
+    # All clouds are pre-composited into one strip. Clouds are a single
+    # colour, so a max blend merges them without darkening the edges.
+    strip = pygame.Surface((strip_w, CLOUD_STRIP_HEIGHT), pygame.SRCALPHA)
+    body_color = (color[0], color[1], color[2], color[3] * alpha // 255)
+
+    for i in range(0, strip_w, CLOUD_SPACING):
+        cx = i + rng.randint(-20, 20)
+        cy = 50 + rng.randint(-20, 20)
+
+        # Random cloud size
+        cloud_w = rng.randint(120, 200)
+        cloud_h = rng.randint(60, 100)
+
+        cloud_surface = pygame.Surface((cloud_w, cloud_h), pygame.SRCALPHA)
+
+        # --- Base cloud body (guarantees visibility) ---
+        pygame.draw.ellipse(
+            cloud_surface,
+            body_color,
+            (int(cloud_w * 0.1), int(cloud_h * 0.3),
+             int(cloud_w * 0.8), int(cloud_h * 0.6))
+        )
+
+        # --- Additional fluffy blobs ---
+        blob_count = rng.randint(3, 6)
+        for _ in range(blob_count):
+            w = rng.randint(cloud_w // 4, cloud_w // 2)
+            h = rng.randint(cloud_h // 3, int(cloud_h * 0.8))
+
+            max_x = max(0, cloud_w - w)
+            max_y = max(0, cloud_h - h)
+
+            x = rng.randint(0, max_x)
+            y = rng.randint(int(cloud_h * 0.15), max_y)
+
+            pygame.draw.ellipse(cloud_surface, body_color, (x, y, w, h))
+
+        for wx in _wrapped(strip_w, cx, cloud_w):
+            strip.blit(cloud_surface, (wx, cy), special_flags=pygame.BLEND_RGBA_MAX)
+
+    return ParallaxLayer(strip, 0, parallax)
@@ -0,0 +1,156 @@
+# --------------------
+# Particles
+# --------------------
+# Hearts and sparkles when a cat is collected, dust when the player lands.
+# Every particle lives in preallocated NumPy arrays, packed into the first
+# `count` rows, and the whole pool moves in one vectorised update. The pool
+# never grows: bursts that don't fit are cut short.
+
+import math
+
+import numpy as np
+import pygame
+
+
+HEART = 0
+SPARKLE = 1
+DUST = 2
+
+FADE_STEPS = 8  # baked alpha levels per sprite
+
+# Per kind: gravity, drag per tick, lifetime in ticks, speed range, direction
+# range in radians (0 is right, -pi/2 is straight up)
+PARTICLE_KINDS = [
+    (-0.03, 0.97, (40, 60), (1.0, 2.2), (-2.5, -0.6)),           # hearts float up
+    (0.05, 0.92, (20, 35), (1.5, 4.0), (0.0, 2 * math.pi)),      # sparkles burst out
+    (0.02, 0.90, (18, 30), (0.6, 2.0), (-math.pi + 0.2, -0.2))   # dust kicks sideways
+]
+
+HEART_COLOR = (255, 120, 170)
+SPARKLE_COLOR = (255, 240, 150)
+DUST_COLOR = (205, 195, 175)
+
+
+def draw_heart(surface):
+    pygame.draw.circle(surface, HEART_COLOR, (3, 3), 3)
+    pygame.draw.circle(surface, HEART_COLOR, (7, 3), 3)
+    pygame.draw.polygon(surface, HEART_COLOR, [(0, 4), (10, 4), (5, 9)])
+
+
+def draw_sparkle(surface):
+    pygame.draw.polygon(surface, SPARKLE_COLOR,
+                        [(4, 0), (5, 3), (8, 4), (5, 5), (4, 8), (3, 5), (0, 4), (3, 3)])
+    surface.set_at((4, 4), (255, 255, 255))
+
+
+def draw_dust(surface):
+    pygame.draw.circle(surface, DUST_COLOR + (170,), (3, 3), 3)
+
+
+PARTICLE_SPRITES = [((11, 10), draw_heart), ((9, 9), draw_sparkle), ((7, 7), draw_dust)]
+
+
+def build_particle_sprites():
+    # FADE_STEPS copies of each sprite, from faintest to fully opaque
+    sprites = []
+    for size, draw in PARTICLE_SPRITES:
+        base = pygame.Surface(size, pygame.SRCALPHA)
+        draw(base)
+        for step in range(1, FADE_STEPS + 1):
+            faded = base.copy()
+            faded.fill((255, 255, 255, 255 * step // FADE_STEPS),
+                       special_flags=pygame.BLEND_RGBA_MULT)
+            sprites.append(faded)
+    return sprites
+
+
+class ParticleSystem:
+    def __init__(self, capacity=512, seed=None):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)      # ticks left
+        self.max_life = np.ones(capacity, np.float32)
+        self.kind = np.zeros(capacity, np.intp)
+        self.count = 0
+        self.dropped = 0  # particles refused because the pool was full
+
+        # Visual only, so it never touches the game's seeded random streams
+        self.rng = np.random.default_rng(seed)
+        self.gravity = np.array([k[0] for k in PARTICLE_KINDS], np.float32)
+        self.drag = np.array([k[1] for k in PARTICLE_KINDS], np.float32)
+        self.sprites = build_particle_sprites()
+        self.half_size = np.array([(w // 2, h // 2) for (w, h), _ in PARTICLE_SPRITES], np.float32)
+        self.scaled = {1.0: (self.sprites, self.half_size)}  # scale -> (sprites, half sizes)
+
+    def _sprites_for(self, scale):
+        if scale not in self.scaled:
+            sprites = [pygame.transform.smoothscale(
+                           s, (max(1, round(s.get_width() * scale)),
+                               max(1, round(s.get_height() * scale))))
+                       for s in self.sprites]
+            self.scaled[scale] = (sprites, self.half_size * np.float32(scale))
+        return self.scaled[scale]
+
+    def emit(self, kind, x, y, n, speed_scale=1.0):
+        room = min(n, self.capacity - self.count)
+        self.dropped += n - room
+        if room <= 0:
+            return
+        _, _, (life_lo, life_hi), (speed_lo, speed_hi), (angle_lo, angle_hi) = PARTICLE_KINDS[kind]
+        rows = slice(self.count, self.count + room)
+
+        angles = self.rng.uniform(angle_lo, angle_hi, room)
+        speeds = self.rng.uniform(speed_lo, speed_hi, room) * speed_scale
+        self.pos[rows] = (x, y)
+        self.vel[rows, 0] = np.cos(angles) * speeds
+        self.vel[rows, 1] = np.sin(angles) * speeds
+        life = self.rng.uniform(life_lo, life_hi, room)
+        self.life[rows] = life
+        self.max_life[rows] = life
+        self.kind[rows] = kind
+        self.count += room
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt=1.0):
+        # dt is in ticks, so particles move at the same speed at any frame rate
+        n = self.count
+        if n == 0:
+            return
+        kinds = self.kind[:n]
+        vel = self.vel[:n]
+        vel[:, 1] += self.gravity[kinds] * dt
+        vel *= (self.drag[kinds] ** dt)[:, None]
+        self.pos[:n] += vel * dt
+        self.life[:n] -= dt
+
+        # Pack the survivors back to the front of the arrays
+        alive = self.life[:n] > 0
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            for array in (self.pos, self.vel, self.life, self.max_life, self.kind):
+                array[:live] = array[:n][alive]
+            self.count = live
+
+    def draw(self, surface, view_x, scale=1.0):
+        # scale is the render target's size relative to the window
+        n = self.count
+        if n == 0:
+            return
+        sprites, half_size = self._sprites_for(scale)
+        kinds = self.kind[:n]
+        fade = np.ceil(self.life[:n] / self.max_life[:n] * FADE_STEPS).astype(np.intp)
+        index = kinds * FADE_STEPS + np.clip(fade, 1, FADE_STEPS) - 1
+
+        corner = self.pos[:n] * np.float32(scale) - half_size[kinds]
+        xs = (corner[:, 0] - view_x * scale).astype(np.int32)
+        ys = corner[:, 1].astype(np.int32)
+        width, height = surface.get_size()
+        shown = (xs > -16) & (xs < width) & (ys > -16) & (ys < height)
+
+        # One blits() call for the lot
+        surface.blits([(sprites[i], (x, y)) for i, x, y in
+                       zip(index[shown].tolist(), xs[shown].tolist(), ys[shown].tolist())],
+                      doreturn=False)
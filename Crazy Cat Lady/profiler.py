@@ -0,0 +1,106 @@
+# --------------------
+# Frame profiler
+# --------------------
+# Splits each frame into named phases. The game calls lap(phase) at the end
+# of every phase, which charges the time since the previous lap to it.
+# Per-frame totals go into a fixed-size ring buffer per phase, so memory
+# stays flat however long the game runs. Callers check `enabled` before
+# calling lap(), which keeps the disabled cost to one attribute test.
+
+import csv
+import json
+import time
+from array import array
+
+
+class FrameProfiler:
+    def __init__(self, phases, history=600, enabled=False):
+        self.phases = list(phases)
+        self.slot = {name: i for i, name in enumerate(self.phases)}
+        self.history = history
+        self.enabled = enabled
+
+        self.samples = [array("d", bytes(8 * history)) for _ in self.phases]
+        self.current = [0.0] * len(self.phases)
+        self.pos = 0      # next ring buffer row
+        self.frames = 0   # frames recorded so far
+        self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.current = [0.0] * len(self.phases)
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[self.slot[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        for ring, value in zip(self.samples, self.current):
+            ring[self.pos] = value
+        self.pos = (self.pos + 1) % self.history
+        self.frames += 1
+
+    # --------------------
+    # Stats
+    # --------------------
+    def _recent(self, i):
+        count = min(self.frames, self.history)
+        ring = self.samples[i]
+        if count < self.history:
+            return list(ring[:count])
+        return list(ring[self.pos:]) + list(ring[:self.pos])
+
+    def stats(self):
+        # {phase: {"mean", "p50", "p95", "p99"}} in milliseconds over the buffer
+        result = {}
+        totals = None
+        for i, name in enumerate(self.phases):
+            values = self._recent(i)
+            totals = values if totals is None else [a + b for a, b in zip(totals, values)]
+            result[name] = summarize(values)
+        result["total"] = summarize(totals or [])
+        return result
+
+    # --------------------
+    # Export
+    # --------------------
+    def dump(self, path):
+        if path.endswith(".json"):
+            self.dump_json(path)
+        else:
+            self.dump_csv(path)
+
+    def dump_csv(self, path):
+        # One row per buffered frame, times in milliseconds
+        columns = [self._recent(i) for i in range(len(self.phases))]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + self.phases)
+            first = self.frames - len(columns[0]) if columns else 0
+            for row, values in enumerate(zip(*columns)):
+                writer.writerow([first + row] + [f"{v * 1000:.4f}" for v in values])
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, "history": self.history,
+                       "phases": self.stats()}, f, indent=2)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(values):
+    # Seconds in, {"mean", "p50", "p95", "p99"} in milliseconds out
+    ordered = sorted(values)
+    mean = sum(ordered) / len(ordered) if ordered else 0.0
+    return {
+        "mean": mean * 1000,
+        "p50": _percentile(ordered, 0.50) * 1000,
+        "p95": _percentile(ordered, 0.95) * 1000,
+        "p99": _percentile(ordered, 0.99) * 1000
+    }
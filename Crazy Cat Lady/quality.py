@@ -0,0 +1,49 @@
+# --------------------
+# Adaptive quality
+# --------------------
+# Watches how long frames take and trades looks for speed when the machine
+# can't keep up. Frames are judged a window at a time: one window over the
+# budget drops a tier straight away, but going back up takes several windows
+# in a row with plenty of headroom, so quality doesn't flicker between tiers.
+
+
+class QualityGovernor:
+    def __init__(self, tier_count, budget_ms, window=60, headroom=0.6, calm_windows=3, level=0):
+        self.tier_count = tier_count
+        self.budget_ms = budget_ms
+        self.window = window
+        self.headroom = headroom          # fraction of the budget that counts as idle
+        self.calm_windows = calm_windows  # idle windows needed before stepping up
+        self.level = level                # 0 is full quality
+
+        self.total_ms = 0.0
+        self.frames = 0
+        self.calm = 0
+
+    def add(self, frame_ms):
+        # Feed one frame's work time; returns True when the level changed
+        self.total_ms += frame_ms
+        self.frames += 1
+        if self.frames < self.window:
+            return False
+
+        average = self.total_ms / self.frames
+        self.total_ms = 0.0
+        self.frames = 0
+
+        if average > self.budget_ms:
+            self.calm = 0
+            if self.level < self.tier_count - 1:
+                self.level += 1
+                return True
+            return False
+
+        if average < self.budget_ms * self.headroom and self.level > 0:
+            self.calm += 1
+            if self.calm >= self.calm_windows:
+                self.calm = 0
+                self.level -= 1
+                return True
+        else:
+            self.calm = 0
+        return False
@@ -0,0 +1,185 @@
+# --------------------
+# Level reachability validator
+# --------------------
+# Checks generated levels against the game's real movement rather than the
+# MAX_JUMP_HEIGHT heuristic the generator uses. For every pair of surfaces
+# (ground and platforms) it works out, for all of them at once with NumPy,
+# whether a jump or a walk off the edge from one can land on the other, then
+# floods out from the ground. Cats count as reachable if their surface is,
+# or if the player can touch them in mid-air from a reachable surface.
+#
+#   python reachability.py --seeds 5000
+#   python reachability.py --seeds 200 --start 1000 --workers 4 --show 20
+#
+# Only the starting layout is checked; respawned cats pick any platform.
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from level import generate_level, GROUND_HEIGHT
+
+# Must match main.py
+SCREEN_H = 450
+PLAYER_W = 40
+PLAYER_H = 60
+SPEED = 3
+JUMP_STRENGTH = -16
+GRAVITY = 0.8
+LANDING_TOLERANCE = 10
+LEVEL_PARAMS = dict(
+    screen_h=SCREEN_H, max_jump_height=abs(JUMP_STRENGTH * 1.5 / GRAVITY),
+    cat_size=50, cat_image_count=6, flower_color_count=4, bush_variant_count=4
+)
+
+ARC_TICKS = 90  # long enough to fall from the top of the screen to the ground
+
+
+def arc(start_vel_y, ticks=ARC_TICKS):
+    # Feet height relative to take-off and fall speed for each tick after it,
+    # stepped exactly like step_world() (pygame.Rect rounds every move)
+    rect = pygame.Rect(0, 10000, PLAYER_W, PLAYER_H)
+    vel_y = start_vel_y
+    heights = []
+    velocities = []
+    for _ in range(ticks):
+        vel_y += GRAVITY
+        rect.y += vel_y
+        heights.append(rect.bottom - 10000 - PLAYER_H)
+        velocities.append(vel_y)
+    return np.array(heights, np.float64), np.array(velocities, np.float64)
+
+
+JUMP_ARC = arc(JUMP_STRENGTH)
+DROP_ARC = arc(0)  # walking off an edge
+ARC_REACH = SPEED * np.arange(1, ARC_TICKS + 1)  # furthest sideways after each tick
+
+
+def surfaces_of(level):
+    # (left, right, top) per surface; row 0 is the ground
+    ground_top = SCREEN_H - GROUND_HEIGHT
+    rows = [(0, level["world_width"], ground_top)]
+    rows += [(x, x + w, y) for x, y, w, h in level["platforms"]]
+    return np.array(rows, np.float64)
+
+
+def landing_edges(surfaces, arc_table):
+    # edges[a, b]: leaving surface a along this arc can land on surface b
+    heights, velocities = arc_table
+    left, right, top = surfaces.T
+    before = np.concatenate(([0.0], heights[:-1]))
+
+    # Drop from a's top to b's top, and the sideways gap between them
+    drop = top[None, :] - top[:, None]
+    gap = np.maximum(left[None, :] - right[:, None], left[:, None] - right[None, :])
+
+    # Axis 0 is the tick. step_world() lands the player when it is falling,
+    # overlaps the platform and its feet were no lower than top + tolerance
+    # on the tick before.
+    h = heights[:, None, None]
+    lands = ((velocities[:, None, None] >= 0)
+             & (h > drop) & (h - PLAYER_H < drop + 10)
+             & (before[:, None, None] <= drop + LANDING_TOLERANCE)
+             & (gap < PLAYER_W + ARC_REACH[:, None, None]))
+    return lands.any(axis=0)
+
+
+def reachable_surfaces(surfaces):
+    edges = landing_edges(surfaces, JUMP_ARC) | landing_edges(surfaces, DROP_ARC)
+    reached = np.zeros(len(surfaces), bool)
+    reached[0] = True  # the player starts on the ground
+    while True:
+        grown = reached | edges[reached].any(axis=0)
+        if (grown == reached).all():
+            return reached
+        reached = grown
+
+
+def touchable_cats(cats, surfaces, reached, cat_size):
+    # Cats whose rect the player's rect can overlap at some point of a jump
+    # from a reachable surface (standing next to one counts, as tick 0)
+    if not len(cats):
+        return np.zeros(0, bool)
+    left, right, top = surfaces[reached].T
+    cat_x = cats[:, 0]
+    cat_top = cats[:, 1]
+    heights = np.concatenate(([0.0], JUMP_ARC[0]))
+    reach = np.concatenate(([0.0], ARC_REACH))
+
+    # Axes: tick, cat, surface
+    feet = top[None, None, :] + heights[:, None, None]
+    vertical = (feet > cat_top[None, :, None]) & (feet - PLAYER_H < cat_top[None, :, None] + cat_size)
+    gap = np.maximum(cat_x[:, None] - right[None, :], left[None, :] - (cat_x[:, None] + cat_size))
+    horizontal = gap[None, :, :] < PLAYER_W + reach[:, None, None]
+    return (vertical & horizontal).any(axis=(0, 2))
+
+
+def validate_seed(seed, world_width=4000):
+    start = time.perf_counter()
+    level = generate_level(seed, world_width=world_width, **LEVEL_PARAMS)
+    generated = time.perf_counter()
+
+    surfaces = surfaces_of(level)
+    reached = reachable_surfaces(surfaces)
+    cats = np.array([(x, y) for x, y, _ in level["cats"]], np.float64).reshape(-1, 2)
+    cats_ok = touchable_cats(cats, surfaces, reached, LEVEL_PARAMS["cat_size"])
+    validated = time.perf_counter()
+
+    return {
+        "seed": seed,
+        "platforms": len(level["platforms"]),
+        "unreachable_platforms": [level["platforms"][i - 1] for i in np.flatnonzero(~reached)],
+        "cats": len(level["cats"]),
+        "unreachable_cats": [level["cats"][i][:2] for i in np.flatnonzero(~cats_ok)],
+        "generate_ms": (generated - start) * 1000,
+        "validate_ms": (validated - generated) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check generated levels are reachable")
+    parser.add_argument("--seeds", type=int, default=1000, help="how many seeds to check")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--world-width", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 to run in-process)")
+    parser.add_argument("--show", type=int, default=10, help="failing seeds to list")
+    args = parser.parse_args()
+
+    seeds = range(args.start, args.start + args.seeds)
+    widths = [args.world_width] * len(seeds)
+    start = time.perf_counter()
+    if args.workers == 1:
+        results = list(map(validate_seed, seeds, widths))
+    else:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(validate_seed, seeds, widths, chunksize=32))
+    elapsed = time.perf_counter() - start
+
+    failing = [r for r in results if r["unreachable_platforms"] or r["unreachable_cats"]]
+    platforms = sum(r["platforms"] for r in results)
+    cats = sum(r["cats"] for r in results)
+    bad_platforms = sum(len(r["unreachable_platforms"]) for r in results)
+    bad_cats = sum(len(r["unreachable_cats"]) for r in results)
+
+    print(f"levels:     {len(results)} seeds in {elapsed:.2f}s, {len(results) / elapsed:.0f} levels/s")
+    print(f"per level:  generate {np.mean([r['generate_ms'] for r in results]):.2f} ms, "
+          f"validate {np.mean([r['validate_ms'] for r in results]):.2f} ms (in worker)")
+    print(f"platforms:  {bad_platforms} of {platforms} unreachable")
+    print(f"cats:       {bad_cats} of {cats} unreachable")
+    print(f"failing:    {len(failing)} seeds ({len(failing) / len(results) * 100:.1f}%)")
+    for r in failing[:args.show]:
+        print(f"  seed {r['seed']}: platforms {r['unreachable_platforms']} "
+              f"cats {r['unreachable_cats']}")
+    return 1 if failing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
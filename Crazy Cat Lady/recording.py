@@ -0,0 +1,131 @@
+# --------------------
+# Input recording and replay
+# --------------------
+# Records the keys step_world() reads on every tick, plus the seed and world
+# settings, so a play session can be replayed tick for tick. Only left, right
+# and jump matter to the simulation, so each tick is a 3-bit mask and the
+# file stores runs of identical masks.
+#
+# File layout (little endian):
+#   header  magic "CCLR", version, seed, endless, world width, max cats,
+#           platform density, decor density, spawn window (-1 for none),
+#           tick count, run count
+#   runs    (mask, ticks) per run
+#   final   player x, player y and cats collected when recording stopped
+
+import bisect
+import struct
+
+import pygame
+
+from input_script import KeyState
+
+RECORDING_MAGIC = b"CCLR"
+RECORDING_VERSION = 2
+RECORDING_HEADER = struct.Struct("<4sHqBIIddiII")
+RUN_RECORD = struct.Struct("<BH")     # key mask, ticks
+FINAL_RECORD = struct.Struct("<iiI")  # player x, player y, cats collected
+MAX_RUN = 0xFFFF
+
+# main.py options that change the simulation; a replay puts them back
+RECORDED_SETTINGS = ("endless", "world_width", "max_cats", "platform_density", "decor_density",
+                     "spawn_window")
+
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+
+# One canned key state per mask, pressing the keys step_world() checks first
+MASK_STATES = [
+    KeyState([key for bit, key in ((LEFT, pygame.K_LEFT), (RIGHT, pygame.K_RIGHT),
+                                   (JUMP, pygame.K_SPACE)) if mask & bit])
+    for mask in range(8)
+]
+
+
+def key_mask(keys):
+    mask = 0
+    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        mask |= LEFT
+    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        mask |= RIGHT
+    if keys[pygame.K_w] or keys[pygame.K_SPACE]:
+        mask |= JUMP
+    return mask
+
+
+class InputRecorder:
+    def __init__(self, seed, settings):
+        self.seed = seed
+        self.settings = settings  # RECORDED_SETTINGS -> value
+        self.runs = []            # [mask, ticks]
+        self.ticks = 0
+
+    def record(self, keys):
+        mask = key_mask(keys)
+        if self.runs and self.runs[-1][0] == mask and self.runs[-1][1] < MAX_RUN:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        self.ticks += 1
+
+    def save(self, path, final):
+        s = self.settings
+        parts = [RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, self.seed,
+                                       s["endless"], s["world_width"], s["max_cats"],
+                                       s["platform_density"], s["decor_density"],
+                                       -1 if s["spawn_window"] is None else s["spawn_window"],
+                                       self.ticks, len(self.runs))]
+        parts += [RUN_RECORD.pack(mask, ticks) for mask, ticks in self.runs]
+        parts.append(FINAL_RECORD.pack(*final))
+        with open(path, "wb") as f:
+            f.write(b"".join(parts))
+
+
+def load_recording(path):
+    # Returns a dict with "seed", the RECORDED_SETTINGS, "ticks", "runs" and "final"
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < RECORDING_HEADER.size:
+        raise ValueError(f"{path}: not a recording")
+    (magic, version, seed, endless, world_width, max_cats, platform_density,
+     decor_density, spawn_window, ticks, run_count) = RECORDING_HEADER.unpack_from(data)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f"{path}: not a recording")
+    if version != RECORDING_VERSION:
+        raise ValueError(f"{path}: recording version {version}, expected {RECORDING_VERSION}")
+
+    offset = RECORDING_HEADER.size
+    end = offset + RUN_RECORD.size * run_count
+    if end + FINAL_RECORD.size > len(data):
+        raise ValueError(f"{path}: truncated recording")
+    return {
+        "seed": seed,
+        "endless": bool(endless),
+        "world_width": world_width,
+        "max_cats": max_cats,
+        "platform_density": platform_density,
+        "decor_density": decor_density,
+        "spawn_window": None if spawn_window < 0 else spawn_window,
+        "ticks": ticks,
+        "runs": list(RUN_RECORD.iter_unpack(data[offset:end])),
+        "final": FINAL_RECORD.unpack_from(data, end)
+    }
+
+
+class ReplayInput:
+    # Same interface as ScriptedInput, but stops (nothing pressed) at the end
+    def __init__(self, recording):
+        self.states = []
+        self.starts = []
+        total = 0
+        for mask, ticks in recording["runs"]:
+            self.states.append(MASK_STATES[mask])
+            self.starts.append(total)
+            total += ticks
+        self.length = total
+
+    def keys_for(self, tick):
+        if tick >= self.length:
+            return MASK_STATES[0]
+        return self.states[bisect.bisect_right(self.starts, tick) - 1]
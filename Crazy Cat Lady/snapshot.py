@@ -0,0 +1,167 @@
+# --------------------
+# Game state snapshots
+# --------------------
+# The whole simulation state as one compact binary blob: player, camera,
+# clouds, timers, the spawn RNG and the cat pool. A fixed level is rebuilt
+# from its seed, so only endless worlds also store their layout: the world
+# edges, the chunk generator and every live chunk. Used for quicksave and
+# quickload, and to start a run from a known state.
+#
+# File layout (little endian):
+#   header     magic "CCLS", version, seed and the recorded world settings
+#   state      tick, player, animation, camera, clouds, counters
+#   random     the spawn RNG (Mersenne Twister words, position, gauss)
+#   cats       (slot, uid, x, y, sprite) per live cat, then the free slots
+#   endless    world edges, generator state and RNG, recent platforms, then
+#              per chunk its platforms, flowers, bushes and generator rects
+
+from array import array
+import os
+import struct
+
+from level import PLATFORM_RECORD, FLOWER_RECORD, BUSH_RECORD
+from recording import RECORDED_SETTINGS
+
+SNAPSHOT_MAGIC = b"CCLS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHqBIIddi")
+# tick, x, y, vel x, vel y, on ground, animation, frame, frame timer,
+# camera x, cloud drift, cats collected, spawn timer, next uid, cats, free slots
+STATE_RECORD = struct.Struct("<IiiidBBHHddIIIHH")
+RANDOM_RECORD = struct.Struct("<625IBd")  # 624 words + position, has gauss, gauss
+CAT_RECORD = struct.Struct("<HIiiB")      # slot, uid, x, y, sprite
+WORLD_RECORD = struct.Struct("<iiH")      # world left, world right, chunks
+GENERATOR_RECORD = struct.Struct("<IqqH")  # next index, next platform x, last y, recent
+CHUNK_RECORD = struct.Struct("<IiHHHH")   # index, x1, platforms, flowers, bushes, rects
+RECT_RECORD = struct.Struct("<iiHH")      # x, y, w, h
+
+STATE_FIELDS = ("tick", "x", "y", "vel_x", "vel_y", "on_ground", "animation", "frame",
+                "frame_timer", "camera_x", "cloud_drift", "cat_count", "spawn_timer",
+                "next_uid")
+
+
+def _pack_random(state):
+    version, words, gauss = state
+    return RANDOM_RECORD.pack(*words, gauss is not None, gauss or 0.0)
+
+
+def _unpack_random(data, offset):
+    fields = RANDOM_RECORD.unpack_from(data, offset)
+    return (3, fields[:625], fields[626] if fields[625] else None)
+
+
+def _pack_records(record, rows):
+    return b"".join(record.pack(*row) for row in rows)
+
+
+def _unpack_records(record, data, offset, count):
+    end = offset + record.size * count
+    if end > len(data):
+        raise ValueError("truncated snapshot")
+    return list(record.iter_unpack(data[offset:end])), end
+
+
+def encode_snapshot(snap):
+    # snap is the dict decode_snapshot() returns
+    window = snap["spawn_window"]
+    parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snap["seed"],
+                                  snap["endless"], snap["world_width"], snap["max_cats"],
+                                  snap["platform_density"], snap["decor_density"],
+                                  -1 if window is None else window),
+             STATE_RECORD.pack(*(snap[key] for key in STATE_FIELDS),
+                               len(snap["cats"]), len(snap["free"])),
+             _pack_random(snap["random"]),
+             _pack_records(CAT_RECORD, snap["cats"]),
+             array("H", snap["free"]).tobytes()]
+
+    world = snap["world"]
+    if world is not None:
+        gen = world["generator"]
+        parts += [WORLD_RECORD.pack(world["left"], world["right"], len(world["chunks"])),
+                  GENERATOR_RECORD.pack(gen["next_index"], gen["next_platform_x"],
+                                        gen["last_y"], len(gen["recent_platforms"])),
+                  _pack_random(gen["random"]),
+                  _pack_records(RECT_RECORD, gen["recent_platforms"])]
+        for chunk in world["chunks"]:
+            rects = gen["chunk_rects"][chunk["index"]]
+            parts += [CHUNK_RECORD.pack(chunk["index"], chunk["x1"], len(chunk["platforms"]),
+                                        len(chunk["flowers"]), len(chunk["bushes"]), len(rects)),
+                      _pack_records(PLATFORM_RECORD, chunk["platforms"]),
+                      _pack_records(FLOWER_RECORD, chunk["flowers"]),
+                      _pack_records(BUSH_RECORD, chunk["bushes"]),
+                      _pack_records(RECT_RECORD, rects)]
+    return b"".join(parts)
+
+
+def decode_snapshot(data):
+    if len(data) < SNAPSHOT_HEADER.size + STATE_RECORD.size + RANDOM_RECORD.size:
+        raise ValueError("not a snapshot")
+    magic, version, seed, *settings = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {version}, expected {SNAPSHOT_VERSION}")
+
+    snap = {"seed": seed}
+    snap.update(zip(RECORDED_SETTINGS, settings))
+    snap["endless"] = bool(snap["endless"])
+    if snap["spawn_window"] < 0:
+        snap["spawn_window"] = None
+
+    offset = SNAPSHOT_HEADER.size
+    *fields, cat_total, free_total = STATE_RECORD.unpack_from(data, offset)
+    snap.update(zip(STATE_FIELDS, fields))
+    snap["on_ground"] = bool(snap["on_ground"])
+    offset += STATE_RECORD.size
+    snap["random"] = _unpack_random(data, offset)
+    offset += RANDOM_RECORD.size
+    snap["cats"], offset = _unpack_records(CAT_RECORD, data, offset, cat_total)
+    end = offset + 2 * free_total
+    if end > len(data):
+        raise ValueError("truncated snapshot")
+    snap["free"] = array("H", data[offset:end]).tolist()
+    offset = end
+
+    snap["world"] = None
+    if snap["endless"]:
+        try:
+            left, right, chunk_total = WORLD_RECORD.unpack_from(data, offset)
+            offset += WORLD_RECORD.size
+            next_index, next_platform_x, last_y, recent_total = \
+                GENERATOR_RECORD.unpack_from(data, offset)
+            offset += GENERATOR_RECORD.size
+            gen = {"next_index": next_index, "next_platform_x": next_platform_x,
+                   "last_y": last_y, "random": _unpack_random(data, offset), "chunk_rects": {}}
+            offset += RANDOM_RECORD.size
+            gen["recent_platforms"], offset = _unpack_records(RECT_RECORD, data, offset,
+                                                              recent_total)
+            chunks = []
+            for _ in range(chunk_total):
+                index, x1, *counts = CHUNK_RECORD.unpack_from(data, offset)
+                offset += CHUNK_RECORD.size
+                chunk = {"index": index, "x1": x1, "cats": []}
+                for key, record, count in zip(("platforms", "flowers", "bushes", "rects"),
+                                              (PLATFORM_RECORD, FLOWER_RECORD, BUSH_RECORD,
+                                               RECT_RECORD), counts):
+                    chunk[key], offset = _unpack_records(record, data, offset, count)
+                gen["chunk_rects"][index] = chunk.pop("rects")
+                chunks.append(chunk)
+        except struct.error:
+            raise ValueError("truncated snapshot") from None
+        snap["world"] = {"left": left, "right": right, "chunks": chunks, "generator": gen}
+    return snap
+
+
+def save_snapshot(path, snap):
+    with open(path + ".tmp", "wb") as f:
+        f.write(encode_snapshot(snap))
+    os.replace(path + ".tmp", path)
+
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return decode_snapshot(data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
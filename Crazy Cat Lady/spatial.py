@@ -0,0 +1,331 @@
+# --------------------
+# Spatial indexes
+# --------------------
+# SpatialHash: uniform grid used to answer "does anything block this rect?"
+# without scanning every registered rect in the world.
+# XIndex: rects kept sorted by their left edge, used as a broad phase for
+# anything that only needs to know what overlaps a horizontal span.
+# SlotIndex: free spots for a fixed-size item standing on each surface, kept
+# as sorted free intervals so a spawn never has to retry random positions.
+
+import bisect
+from itertools import accumulate
+
+import pygame
+
+
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def _cell_keys(self, rect):
+        cs = self.cell_size
+        # Zero-sized rects never collide with anything, so they own no cells
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+            for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+                yield cx, cy
+
+    # Each cell maps id(rect) -> rect, so rects are matched by identity (two
+    # equal rects can coexist) and removal is O(1) per cell
+    def insert(self, rect):
+        indexed = False
+        for key in self._cell_keys(rect):
+            self.cells.setdefault(key, {})[id(rect)] = rect
+            indexed = True
+        if indexed:
+            self.count += 1
+
+    def remove(self, rect):
+        removed = False
+        for key in self._cell_keys(rect):
+            bucket = self.cells.get(key)
+            if bucket is None or bucket.pop(id(rect), None) is None:
+                continue
+            removed = True
+            if not bucket:
+                del self.cells[key]
+        if removed:
+            self.count -= 1
+        return removed
+
+    def query(self, rect):
+        found = {}
+        for key in self._cell_keys(rect):
+            for rid, r in self.cells.get(key, {}).items():
+                if rid not in found and rect.colliderect(r):
+                    found[rid] = r
+        return list(found.values())
+
+    def collides(self, rect):
+        for key in self._cell_keys(rect):
+            for r in self.cells.get(key, {}).values():
+                if rect.colliderect(r):
+                    return True
+        return False
+
+    def __len__(self):
+        return self.count
+
+
+class XIndex:
+    def __init__(self):
+        self.lefts = []
+        self.entries = []  # (seq, rect, item), parallel to lefts
+        self.max_width = 0
+        self._next_seq = 0
+
+    def insert(self, rect, item=None):
+        if item is None:
+            item = rect
+        i = bisect.bisect_right(self.lefts, rect.left)
+        self.lefts.insert(i, rect.left)
+        self.entries.insert(i, (self._next_seq, rect, item))
+        self._next_seq += 1
+        self.max_width = max(self.max_width, rect.width)
+
+    def remove(self, rect, item=None):
+        if item is None:
+            item = rect
+        lo = bisect.bisect_left(self.lefts, rect.left)
+        hi = bisect.bisect_right(self.lefts, rect.left)
+        for i in range(lo, hi):
+            if self.entries[i][2] is item:
+                del self.lefts[i]
+                del self.entries[i]
+                return True
+        return False
+
+    def query(self, x0, x1):
+        # Items whose [left, right) overlaps [x0, x1), in insertion order so
+        # callers see the same ordering a plain list walk would give them
+        lo = bisect.bisect_right(self.lefts, x0 - self.max_width)
+        hi = bisect.bisect_left(self.lefts, x1)
+        hits = [(seq, item) for seq, rect, item in self.entries[lo:hi]
+                if rect.right > x0]
+        hits.sort(key=lambda hit: hit[0])
+        return [item for _, item in hits]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Item x positions on a surface are split into segments this wide, so a
+# change only rebuilds the free intervals of the segments it reaches
+SLOT_SEGMENT_WIDTH = 1024
+
+
+class _Segment:
+    __slots__ = ("blocked", "starts", "ends", "cum")
+
+    def __init__(self):
+        self.blocked = {}   # id(blocker) -> (first, last) item x it rules out
+        self.starts = []    # free intervals of item x, inclusive, sorted
+        self.ends = []
+        self.cum = []       # free positions in intervals 0..i
+
+
+class _Surface:
+    __slots__ = ("rect", "key", "band", "first", "last", "blocked",
+                 "segments", "stale", "totals", "cum")
+
+    def __init__(self, rect, band, item_w):
+        self.rect = rect
+        self.key = (rect.left, rect.top, id(rect))  # as added, for the roomy list
+        self.band = band    # where a blocker has to reach to cover any spot
+        self.first = rect.left            # item x range on this surface
+        self.last = rect.right - item_w
+        self.blocked = {}   # id(blocker) -> (first, last) item x it rules out
+        count = (self.last - self.first) // SLOT_SEGMENT_WIDTH + 1
+        self.segments = [_Segment() for _ in range(count)]
+        self.stale = set(range(count))  # segments to rebuild on the next pick
+        self.totals = [0] * count  # free positions per segment
+        self.cum = []       # free positions in segments 0..i
+
+    def _span(self, lo, hi):
+        # Segment indices a blocked range reaches, as a range
+        lo, hi = max(lo, self.first), min(hi, self.last)
+        if lo > hi:
+            return range(0)
+        return range((lo - self.first) // SLOT_SEGMENT_WIDTH,
+                     (hi - self.first) // SLOT_SEGMENT_WIDTH + 1)
+
+    def add_blocker(self, rid, lo, hi):
+        self.blocked[rid] = (lo, hi)
+        for i in self._span(lo, hi):
+            self.segments[i].blocked[rid] = (lo, hi)
+            self.stale.add(i)
+
+    def remove_blocker(self, rid):
+        span = self.blocked.pop(rid, None)
+        if span is None:
+            return False
+        for i in self._span(*span):
+            del self.segments[i].blocked[rid]
+            self.stale.add(i)
+        return True
+
+    def rebuild(self):
+        for i in self.stale:
+            segment = self.segments[i]
+            first = self.first + i * SLOT_SEGMENT_WIDTH
+            last = min(first + SLOT_SEGMENT_WIDTH - 1, self.last)
+            starts, ends, cum = [], [], []
+            x = first
+            for lo, hi in sorted(segment.blocked.values()):
+                if x > last:
+                    break
+                if lo > x:
+                    starts.append(x)
+                    ends.append(min(lo - 1, last))
+                    cum.append((cum[-1] if cum else 0) + ends[-1] - x + 1)
+                x = max(x, hi + 1)
+            if x <= last:
+                starts.append(x)
+                ends.append(last)
+                cum.append((cum[-1] if cum else 0) + last - x + 1)
+            segment.starts, segment.ends, segment.cum = starts, ends, cum
+            self.totals[i] = cum[-1] if cum else 0
+        self.stale.clear()
+        self.cum = list(accumulate(self.totals))
+
+
+class SlotIndex:
+    # An item fits at x on a surface when its rect, standing on the surface
+    # and inflated by padding, touches no blocking rect (the same test as
+    # level.can_place). Each surface keeps the x ranges its blockers rule out
+    # and rebuilds its free intervals lazily, on the next pick after a change,
+    # one SLOT_SEGMENT_WIDTH segment at a time so long surfaces stay cheap.
+    # Blockers are mirrored from a SpatialHash: add_surface() reads what is
+    # already there and block()/unblock() follow later inserts and removals.
+    def __init__(self, blocking, item_w, item_h, padding=0):
+        self.blocking = blocking
+        self.item_w = item_w
+        self.item_h = item_h
+        self.padding = padding
+        self.bands = SpatialHash(256)
+        self.surfaces = {}  # id(surface rect) -> _Surface
+        self.owners = {}    # id(band) -> _Surface
+        self.dirty = {}     # id(surface rect) -> _Surface, in change order
+        # Surfaces with at least one free spot, sorted by position so picks
+        # depend only on what is in the world, not on the order it changed in
+        self.roomy = []
+        self.roomy_keys = []
+        self.top = self.bottom = 0  # vertical extent of every band
+
+    def _blocked_range(self, rect):
+        half = self.padding // 2
+        return (rect.left - self.item_w - self.padding + half + 1,
+                rect.right + half - 1)
+
+    def add_surface(self, rect):
+        if rect.width < self.item_w:
+            return
+        half = self.padding // 2
+        band = pygame.Rect(rect.left - half, rect.top - self.item_h - half,
+                           rect.width + self.padding, self.item_h + self.padding)
+        surface = _Surface(rect, band, self.item_w)
+        for blocker in self.blocking.query(band):
+            surface.add_blocker(id(blocker), *self._blocked_range(blocker))
+        if not self.surfaces:
+            self.top, self.bottom = band.top, band.bottom
+        self.top = min(self.top, band.top)
+        self.bottom = max(self.bottom, band.bottom)
+        self.surfaces[id(rect)] = surface
+        self.owners[id(band)] = surface
+        self.bands.insert(band)
+        self.dirty[id(rect)] = surface
+
+    def remove_surface(self, rect):
+        surface = self.surfaces.pop(id(rect), None)
+        if surface is None:
+            return False
+        del self.owners[id(surface.band)]
+        self.bands.remove(surface.band)
+        self.dirty.pop(id(rect), None)
+        self._set_roomy(surface, False)
+        return True
+
+    def resize_surface(self, rect):
+        # For a surface rect that was moved or resized in place
+        self.remove_surface(rect)
+        self.add_surface(rect)
+
+    def block(self, rect):
+        for band in self.bands.query(rect):
+            surface = self.owners[id(band)]
+            surface.add_blocker(id(rect), *self._blocked_range(rect))
+            self.dirty[id(surface.rect)] = surface
+
+    def unblock(self, rect):
+        for band in self.bands.query(rect):
+            surface = self.owners[id(band)]
+            if surface.remove_blocker(id(rect)):
+                self.dirty[id(surface.rect)] = surface
+
+    def _set_roomy(self, surface, roomy):
+        i = bisect.bisect_left(self.roomy_keys, surface.key)
+        listed = i < len(self.roomy) and self.roomy[i] is surface
+        if roomy and not listed:
+            self.roomy_keys.insert(i, surface.key)
+            self.roomy.insert(i, surface)
+        elif not roomy and listed:
+            del self.roomy_keys[i]
+            del self.roomy[i]
+
+    def _refresh(self):
+        for surface in self.dirty.values():
+            surface.rebuild()
+            self._set_roomy(surface, surface.cum[-1] > 0)
+        self.dirty.clear()
+
+    def _item_rect(self, surface, x):
+        return pygame.Rect(x, surface.rect.top - self.item_h, self.item_w, self.item_h)
+
+    def pick(self, rng):
+        # A free item rect on a random surface with room, or None
+        self._refresh()
+        if not self.roomy:
+            return None
+        surface = rng.choice(self.roomy)
+        k = rng.randrange(surface.cum[-1])
+        s = bisect.bisect_right(surface.cum, k)
+        if s:
+            k -= surface.cum[s - 1]
+        segment = surface.segments[s]
+        i = bisect.bisect_right(segment.cum, k)
+        return self._item_rect(surface, segment.ends[i] - (segment.cum[i] - 1 - k))
+
+    def pick_within(self, rng, x0, x1):
+        # Like pick(), but the item has to lie entirely inside [x0, x1)
+        self._refresh()
+        last = x1 - self.item_w
+        area = pygame.Rect(x0, self.top, x1 - x0, self.bottom - self.top)
+        candidates = []
+        for band in self.bands.query(area):
+            surface = self.owners[id(band)]
+            spans = []
+            for s in surface._span(x0, last):
+                segment = surface.segments[s]
+                i = bisect.bisect_left(segment.ends, x0)
+                while i < len(segment.starts) and segment.starts[i] <= last:
+                    spans.append((max(segment.starts[i], x0), min(segment.ends[i], last)))
+                    i += 1
+            if spans:
+                candidates.append((surface.rect.left, surface.rect.top, spans, surface))
+        if not candidates:
+            return None
+        # Band order depends on the grid, so sort for a repeatable choice
+        candidates.sort(key=lambda c: c[:2])
+        _, _, spans, surface = rng.choice(candidates)
+        k = rng.randrange(sum(end - start + 1 for start, end in spans))
+        for start, end in spans:
+            if k <= end - start:
+                return self._item_rect(surface, start + k)
+            k -= end - start + 1
+
+    def __len__(self):
+        return len(self.surfaces)
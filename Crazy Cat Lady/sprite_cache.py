@@ -0,0 +1,138 @@
+# --------------------
+# Pre-rendered decoration sprites
+# --------------------
+# Decorations that used to be drawn from primitives every frame are baked
+# once at startup and blitted from here instead.
+
+import math
+
+import pygame
+
+
+# --------------------
+# Flowers
+# --------------------
+FLOWER_SWAY = 4        # max sideways sway in pixels
+FLOWER_PHASES = 32     # quantised steps of one sway cycle
+FLOWER_SWAY_PERIOD = 400 * 2 * math.pi  # ms, matches sin(ticks / 400)
+
+# The stem base sits at the anchor; the sprite leaves room for sway and petals
+FLOWER_ANCHOR_X = 14
+FLOWER_ANCHOR_Y = 28
+FLOWER_SPRITE_SIZE = (28, 30)
+
+STEM_COLOR = (90, 150, 90)
+FLOWER_CENTER_COLOR = (255, 230, 120)
+
+flower_sway_table = [math.sin(2 * math.pi * i / FLOWER_PHASES) * FLOWER_SWAY
+                     for i in range(FLOWER_PHASES)]
+
+
+def draw_flower(surface, color, fx, fy):
+    pygame.draw.line(surface, STEM_COLOR, (int(fx), int(fy)), (int(fx), int(fy - 18)), 2)
+    for angle in range(0, 360, 60):
+        rad = math.radians(angle)
+        pygame.draw.circle(surface, color,
+                           (int(fx + math.cos(rad) * 5), int(fy - 18 + math.sin(rad) * 5)), 4)
+    pygame.draw.circle(surface, FLOWER_CENTER_COLOR, (int(fx), int(fy - 18)), 3)
+
+
+def build_flower_cache(colors):
+    # One frame per (colour, sway phase)
+    cache = {}
+    for color in colors:
+        frames = []
+        for sway in flower_sway_table:
+            frame = pygame.Surface(FLOWER_SPRITE_SIZE, pygame.SRCALPHA)
+            draw_flower(frame, color, FLOWER_ANCHOR_X + sway, FLOWER_ANCHOR_Y)
+            frames.append(frame)
+        cache[color] = frames
+    return cache
+
+
+def flower_phase(ticks, angle):
+    # Same phase as sin(ticks / 400 + angle), rounded to the nearest frame
+    cycle = ticks / FLOWER_SWAY_PERIOD + angle / (2 * math.pi)
+    return int(cycle * FLOWER_PHASES + 0.5) % FLOWER_PHASES
+
+
+# --------------------
+# Bushes
+# --------------------
+BUSH_GREENS = [
+    (95, 140, 95),
+    (85, 130, 85),
+    (75, 120, 75)
+]
+
+# (dx, dy, radius) relative to the bush's left edge and bottom
+BUSH_CIRCLES = [
+    (-5, -8, 10),
+    (8, -14, 14),
+    (22, -10, 12),
+    (4, -20, 12),
+    (16, -22, 10)
+]
+
+BUSH_JITTER = 2        # max offset/radius change for variants
+BUSH_SHADE_JITTER = 10
+
+# Room for the widest circles plus jitter on every side
+BUSH_ANCHOR_X = 15 + 2 * BUSH_JITTER
+BUSH_ANCHOR_Y = 32 + 2 * BUSH_JITTER
+BUSH_SPRITE_SIZE = (BUSH_ANCHOR_X + 35 + 2 * BUSH_JITTER,
+                    BUSH_ANCHOR_Y + 3 + 2 * BUSH_JITTER)
+
+
+def draw_bush(surface, base_x, base_y, circles=BUSH_CIRCLES, greens=BUSH_GREENS):
+    for i, (dx, dy, r) in enumerate(circles):
+        pygame.draw.circle(
+            surface,
+            greens[i % len(greens)],
+            (int(base_x + dx), int(base_y + dy)),
+            r
+        )
+
+
+def bake_bush(circles=BUSH_CIRCLES, greens=BUSH_GREENS):
+    sprite = pygame.Surface(BUSH_SPRITE_SIZE, pygame.SRCALPHA)
+    draw_bush(sprite, BUSH_ANCHOR_X, BUSH_ANCHOR_Y, circles, greens)
+    return sprite
+
+
+def build_bush_variants(count, rng):
+    # Variant 0 is always the classic bush; the rest are jittered copies
+    variants = [bake_bush()]
+    for _ in range(count - 1):
+        circles = [(dx + rng.randint(-BUSH_JITTER, BUSH_JITTER),
+                    dy + rng.randint(-BUSH_JITTER, BUSH_JITTER),
+                    r + rng.randint(-BUSH_JITTER, BUSH_JITTER))
+                   for dx, dy, r in BUSH_CIRCLES]
+        shade = rng.randint(-BUSH_SHADE_JITTER, BUSH_SHADE_JITTER)
+        greens = [tuple(max(0, min(255, c + shade)) for c in green)
+                  for green in BUSH_GREENS]
+        variants.append(bake_bush(circles, greens))
+    return variants
+
+
+# --------------------
+# Scaled copies
+# --------------------
+class ScaledSprites:
+    # Smoothscaled copies of sprites for a render target smaller than the
+    # window, made on first use. Sprites are matched by identity, so only
+    # pass ones that live for the whole game (not per-frame flips).
+    def __init__(self, scale):
+        self.scale = scale
+        self.sprites = {}  # id -> (original, scaled)
+
+    def get(self, surface):
+        if self.scale == 1.0:
+            return surface
+        entry = self.sprites.get(id(surface))
+        if entry is None:
+            w, h = surface.get_size()
+            scaled = pygame.transform.smoothscale(
+                surface, (max(1, round(w * self.scale)), max(1, round(h * self.scale))))
+            entry = self.sprites[id(surface)] = (surface, scaled)
+        return entry[1]
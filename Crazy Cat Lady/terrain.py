@@ -0,0 +1,64 @@
+# --------------------
+# Static terrain chunk cache
+# --------------------
+# Ground, platforms and bushes never move, so they are baked into fixed-width
+# strips of the world. Strips are rendered the first time the camera sees
+# them and the least recently used ones are dropped once off-screen.
+
+from collections import OrderedDict
+import math
+
+import pygame
+
+
+class TerrainChunkCache:
+    def __init__(self, render_chunk, height, chunk_width=512, max_chunks=4):
+        # render_chunk(surface, x0) draws the world span [x0, x0 + chunk_width)
+        self.render_chunk = render_chunk
+        self.height = height
+        self.chunk_width = chunk_width
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.scale = 1.0
+
+    def set_scale(self, scale):
+        # For smaller render targets chunks are baked full size, then shrunk
+        if scale != self.scale:
+            self.scale = scale
+            self.chunks.clear()
+
+    def _get(self, index):
+        chunk = self.chunks.get(index)
+        if chunk is None:
+            chunk = pygame.Surface((self.chunk_width, self.height), pygame.SRCALPHA)
+            self.render_chunk(chunk, index * self.chunk_width)
+            if self.scale != 1.0:
+                chunk = pygame.transform.smoothscale(
+                    chunk, (math.ceil(self.chunk_width * self.scale),
+                            math.ceil(self.height * self.scale)))
+            self.chunks[index] = chunk
+        else:
+            self.chunks.move_to_end(index)
+        return chunk
+
+    def draw(self, screen, camera_x):
+        scale = self.scale
+        first = int(camera_x // self.chunk_width)
+        last = int((camera_x + screen.get_width() / scale - 1) // self.chunk_width)
+        for index in range(first, last + 1):
+            chunk = self._get(index)
+            screen.blit(chunk, ((index * self.chunk_width - camera_x) * scale, 0))
+
+        # Only chunks that just went off-screen can be evicted
+        while len(self.chunks) > max(self.max_chunks, last - first + 1):
+            self.chunks.popitem(last=False)
+
+    def invalidate(self, x0=None, x1=None):
+        # Drop cached chunks touching [x0, x1), or everything
+        if x0 is None:
+            self.chunks.clear()
+            return
+        first = int(x0 // self.chunk_width)
+        last = int((x1 - 1) // self.chunk_width)
+        for index in range(first, last + 1):
+            self.chunks.pop(index, None)
@@ -0,0 +1,27 @@
+# --------------------
+# Text surface cache
+# --------------------
+# font.render is slow compared to a blit, and most on-screen text repeats
+# frame after frame, so rendered strings are kept and reused. The least
+# recently used entries are dropped once the cache is full.
+
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
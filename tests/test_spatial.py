@@ -0,0 +1,123 @@
+# --------------------
+# SpatialHash / can_place against a brute-force scan
+# --------------------
+
+import os
+import random
+import sys
+
+import pygame
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "Crazy Cat Lady"))
+
+from level import PLACEMENT_PADDING, can_place  # noqa: E402
+from spatial import SLOT_SEGMENT_WIDTH, SlotIndex, SpatialHash  # noqa: E402
+
+
+def brute_can_place(rects, rect, padding=PLACEMENT_PADDING):
+    test = rect.inflate(padding, padding)
+    return not any(test.colliderect(r) for r in rects)
+
+
+def random_rect(rng):
+    # Mostly small rects, some spanning many cells, some with zero size
+    width = rng.choice((0, rng.randint(1, 40), rng.randint(1, 300)))
+    height = rng.choice((0, rng.randint(1, 40), rng.randint(1, 300)))
+    return pygame.Rect(rng.randint(-200, 1200), rng.randint(-200, 800), width, height)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_sequences_match_brute_force(seed):
+    rng = random.Random(seed)
+    index = SpatialHash(rng.choice((16, 64, 256)))
+    rects = []
+    for step in range(400):
+        op = rng.random()
+        if op < 0.45 or not rects:
+            rect = random_rect(rng)
+            index.insert(rect)
+            rects.append(rect)
+        elif op < 0.7:
+            rect = rects.pop(rng.randrange(len(rects)))
+            index.remove(rect)
+        else:
+            test = random_rect(rng)
+            padding = rng.choice((0, PLACEMENT_PADDING))
+            assert can_place(index, test, padding) == brute_can_place(rects, test, padding)
+            expected = {id(r) for r in rects if test.colliderect(r)}
+            assert {id(r) for r in index.query(test)} == expected
+    assert len(index) == sum(1 for r in rects if r.width > 0 and r.height > 0)
+
+
+def test_zero_size_rects_never_block():
+    index = SpatialHash()
+    empty = pygame.Rect(100, 100, 0, 0)
+    flat = pygame.Rect(100, 100, 50, 0)
+    for rect in (empty, flat):
+        index.insert(rect)
+    assert len(index) == 0
+    test = pygame.Rect(90, 90, 20, 20)
+    assert can_place(index, test) == brute_can_place([empty, flat], test)
+    assert can_place(index, test)
+
+    # A zero-size test rect never collides either
+    index.insert(pygame.Rect(0, 0, 64, 64))
+    point = pygame.Rect(10, 10, 0, 0)
+    assert can_place(index, point, 0) == brute_can_place([pygame.Rect(0, 0, 64, 64)], point, 0)
+    assert index.remove(empty) is False
+
+
+def test_equal_rects_are_tracked_separately():
+    index = SpatialHash()
+    first = pygame.Rect(200, 200, 40, 40)
+    second = pygame.Rect(200, 200, 40, 40)
+    index.insert(first)
+    index.insert(second)
+    assert len(index) == 2
+
+    test = pygame.Rect(210, 210, 10, 10)
+    assert len(index.query(test)) == 2
+    assert index.remove(first)
+    assert not can_place(index, test)
+    assert can_place(index, test) == brute_can_place([second], test)
+    assert index.remove(second)
+    assert can_place(index, test) == brute_can_place([], test)
+    assert len(index) == 0
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_slot_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    item = 40
+    index = SpatialHash()
+    slots = SlotIndex(index, item, item, PLACEMENT_PADDING)
+    # One surface several segments long, so blockers straddle segment edges
+    surfaces = [pygame.Rect(0, 400, 3 * SLOT_SEGMENT_WIDTH + 77, 20),
+                pygame.Rect(300, 250, 500, 20)]
+    for surface in surfaces:
+        slots.add_surface(surface)
+    rects = []
+    for step in range(150):
+        if rng.random() < 0.6 or not rects:
+            rect = pygame.Rect(rng.randint(-60, surfaces[0].right), rng.randint(200, 400),
+                               rng.randint(0, 120), rng.randint(0, 60))
+            index.insert(rect)
+            slots.block(rect)
+            rects.append(rect)
+        else:
+            rect = rects.pop(rng.randrange(len(rects)))
+            index.remove(rect)
+            slots.unblock(rect)
+
+        for rect, x0, x1 in ((slots.pick(rng), -1000, 10000),
+                             (slots.pick_within(rng, 900, 1300), 900, 1300)):
+            if rect is None:
+                assert not any(brute_can_place(rects, pygame.Rect(x, s.top - item, item, item))
+                               for s in surfaces
+                               for x in range(max(s.left, x0), min(s.right, x1) - item + 1))
+            else:
+                assert any(rect.bottom == s.top and s.left <= rect.left and rect.right <= s.right
+                           for s in surfaces)
+                assert x0 <= rect.left and rect.right <= x1
+                assert brute_can_place(rects, rect)